@@ -0,0 +1,53 @@
+"""JWT authentication with a short lived cache of token users.
+
+A sliding token only carries the username, so every authenticated call
+would look the user up again. Resolved users are cached for
+``JWT_USER_CACHE_TIMEOUT`` seconds under their token id, and dropped
+whenever the user is saved or deleted, which covers deactivation and
+password changes.
+"""
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from core import routers
+
+
+USER_KEY = 'jwt-user:{}'
+
+
+def user_key(user_id):
+    # usernames may hold characters cache backends reject in keys
+    return USER_KEY.format(quote(str(user_id)))
+
+
+def forget_user(*user_ids):
+    """Drop cached users now and once more after the commit.
+
+    The second delete catches a user a concurrent request cached from
+    the database before the write became visible.
+    """
+    keys = [user_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        key = user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            # unknown and inactive users raise here and are not cached;
+            # read from the primary, a replica may miss a deactivation
+            with routers.primary():
+                user = super().get_user(validated_token)
+            cache.set(key, user, timeout=settings.JWT_USER_CACHE_TIMEOUT)
+        return user
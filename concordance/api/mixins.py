@@ -0,0 +1,121 @@
+from django.conf import settings
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from posts import conditional
+
+
+class ConditionalGetMixin:
+    """Answer conditional ``list``/``retrieve`` requests with 304.
+
+    Authentication and permissions are checked first, then the
+    validators are computed from ``get_scopes()`` before the queryset
+    is touched.
+    """
+
+    def get_scopes(self):
+        raise NotImplementedError
+
+    def conditional(self, action, request, *args, **kwargs):
+        return conditional.respond(
+            request, self.get_scopes(),
+            lambda: action(request, *args, **kwargs),
+            request.accepted_renderer.format,
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class BatchCreateMixin:
+    """``POST <list>/batch/`` creates up to ``API_BATCH_SIZE_LIMIT`` items.
+
+    The batch is validated as a whole and inserted in one transaction:
+    either every item is created, or nothing is and the response lists
+    the errors of each item in request order.
+    """
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request, *args, **kwargs):
+        limit = settings.API_BATCH_SIZE_LIMIT
+        if isinstance(request.data, list) and len(request.data) > limit:
+            raise serializers.ValidationError({
+                'non_field_errors': [
+                    f'Ensure this batch has no more than {limit} items.'
+                ]
+            })
+        serializer = self.get_serializer(
+            data=request.data, many=True, allow_empty=False
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class SparseFieldsetMixin:
+    """Narrow the queryset of ``?fields=``/``?expand=`` reads.
+
+    Only the columns and joins the trimmed serializer reads are loaded,
+    plus ``query_keys``, which the paginator orders by.
+    """
+    query_keys = ('id',)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if (self.request.method not in SAFE_METHODS
+                or not ('fields' in params or 'expand' in params)):
+            return queryset
+        only, related = self.get_serializer().query_plan(self.query_keys)
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only)
+
+
+class ValuesReadMixin:
+    """Serve ``list``/``retrieve`` from ``values()`` rows.
+
+    ``values_serializer_class`` wraps the regular serializer and renders
+    the same output, ``?fields=`` included, without building model
+    instances. Requests it does not support take the regular path.
+    """
+    values_serializer_class = None
+
+    def get_values_serializer(self):
+        if self.values_serializer_class is None:
+            return None
+        serializer = self.values_serializer_class(self.get_serializer())
+        return serializer if serializer.supported else None
+
+    def get_values_queryset(self, serializer):
+        queryset = self.filter_queryset(self.get_queryset())
+        return queryset.values(*serializer.query_paths(self.query_keys))
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_values_serializer()
+        if serializer is None:
+            return super().list(request, *args, **kwargs)
+        rows = self.get_values_queryset(serializer)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.many(page))
+        return Response(serializer.many(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_values_serializer()
+        if serializer is None:
+            return super().retrieve(request, *args, **kwargs)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            self.get_values_queryset(serializer),
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, row)
+        return Response(serializer.to_representation(row))
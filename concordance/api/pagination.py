@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from posts.utils import KeysetPaginator
+
+
+class KeysetOrLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset pagination with an opt-in ``?cursor=`` keyset mode.
+
+    Sending ``cursor`` (empty for the first page) switches to keyset
+    pagination over ``(pub_date, id)``: no ``COUNT(*)``, no ``OFFSET``,
+    and ``next``/``previous`` links carry opaque cursors.
+    """
+    cursor_query_param = 'cursor'
+    descending = True
+    keyset_only = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_page = None
+        if (not self.keyset_only
+                and self.cursor_query_param not in request.query_params):
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.limit = self.get_limit(request)
+        paginator = KeysetPaginator(
+            queryset, self.limit, descending=self.descending
+        )
+        self.keyset_page = paginator.get_page(
+            request.query_params.get(self.cursor_query_param)
+        )
+        return list(self.keyset_page)
+
+    def get_paginated_response(self, data):
+        if self.keyset_page is None:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_cursor_link(self.keyset_page.next_cursor)),
+            ('previous', self.get_cursor_link(
+                self.keyset_page.previous_cursor
+            )),
+            ('results', data)
+        ]))
+
+    def get_cursor_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+
+class CommentsPagination(KeysetOrLimitOffsetPagination):
+    """Oldest first keyset pages, whether or not a cursor is sent."""
+    descending = False
+    keyset_only = True
+    default_limit = settings.COMMENTS_PER_PAGE
+    max_limit = 100
@@ -5,4 +5,4 @@ class IsAuthorOrReadOnly(permissions.IsAuthenticated):
 
     def has_object_permission(self, request, view, obj):
         return (request.method in permissions.SAFE_METHODS
-                or request.user.id == obj.author.id)
+                or request.user.id == obj.author_id)
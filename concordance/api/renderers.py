@@ -0,0 +1,40 @@
+"""JSON rendering through orjson where it is installed."""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` output, encoded by orjson.
+
+    Produces the same bytes as the stock renderer: values orjson would
+    format differently (dates, decimals, lazy strings...) go through the
+    DRF encoder, and indented or ASCII-only output, or data orjson can
+    not encode at all, falls back to the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (orjson is None or indent is not None or self.ensure_ascii
+                or not self.compact):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=(
+                    orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_PASSTHROUGH_DATACLASS
+                ),
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # the escapes JSONRenderer applies for JavaScript compatibility
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
@@ -1,30 +1,175 @@
+from operator import itemgetter
+
+from django.conf import settings
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.relations import SlugRelatedField
-from rest_framework.validators import UniqueTogetherValidator 
+from rest_framework.settings import api_settings
 
+from posts import bulk
 from posts.models import User, Post, Group, Comment, Follow
+from posts.images import normalize
+from posts.thumbnails import srcset, stored_thumbnail
+
+
+class BulkCreateListSerializer(serializers.ListSerializer):
+    """Create every item of a batch with one bulk insert."""
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        return bulk.create(model, (model(**attrs) for attrs in validated_data))
+
+
+def requested_fields(request):
+    """``?fields=`` and ``?expand=`` of a read request as two sets.
+
+    ``fields`` is ``None`` when every field is wanted. Writes always get
+    the full representation back.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+    params = request.query_params
+    fields = {name for name in params.get('fields', '').split(',') if name}
+    expand = {name for name in params.get('expand', '').split(',') if name}
+    return fields or None, expand
+
+
+class SparseFieldsMixin:
+    """Trim and expand a serializer from the request query string.
+
+    ``Meta.expandable`` maps a relation to the serializer that replaces
+    it under ``?expand=``, and to the model paths that serializer reads.
+    ``Meta.sources`` lists the model paths of fields that are not plain
+    model fields, so ``query_plan()`` can tell which columns and joins a
+    response needs. Unknown field names are rejected with the valid
+    ones; unknown expansions are ignored.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, expand = requested_fields(self.context.get('request'))
+        expandable = getattr(self.Meta, 'expandable', {})
+        self.expanded = expand & set(expandable)
+        for name in self.expanded:
+            serializer_class, _ = expandable[name]
+            self.fields[name] = serializer_class(read_only=True)
+        if fields is not None:
+            unknown = fields - set(self.fields)
+            if unknown:
+                raise serializers.ValidationError({'fields': [
+                    f'Unknown fields: {", ".join(sorted(unknown))}. '
+                    f'Valid fields: {", ".join(self.fields)}.'
+                ]})
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+    def query_plan(self, always=()):
+        """``only()`` and ``select_related()`` arguments for the fields.
+
+        ``always`` adds paths the view needs on its own, e.g. the
+        ordering keys read by the paginator.
+        """
+        sources = getattr(self.Meta, 'sources', {})
+        expandable = getattr(self.Meta, 'expandable', {})
+        paths = set(always)
+        for name in self.fields:
+            if name in self.expanded:
+                paths.update(expandable[name][1])
+            else:
+                paths.update(sources.get(name, (name,)))
+        related = {path.rsplit('__', 1)[0] for path in paths if '__' in path}
+        # a relation followed by select_related can not be deferred
+        paths.update(related)
+        return sorted(paths), sorted(related)
+
 
+def thumbnail_urls(request, image, rendered):
+    urls = {}
+    for alias in settings.POST_THUMBNAILS:
+        url = stored_thumbnail(image, rendered, alias)
+        if url is not None:
+            urls[alias] = (
+                request.build_absolute_uri(url.url) if request else url.url
+            )
+    return urls
+
+
+def thumbnail_srcsets(request, image, rendered):
+    """``srcset`` values of every alias, for the stored and WebP format."""
+    build_url = request.build_absolute_uri if request else str
+    srcsets = {}
+    for alias in settings.POST_THUMBNAILS:
+        thumbnail = stored_thumbnail(image, rendered, alias)
+        if thumbnail is not None and thumbnail.variants:
+            srcsets[alias] = {
+                'default': srcset(thumbnail.variants, build_url),
+            }
+            if thumbnail.webp:
+                srcsets[alias]['webp'] = srcset(thumbnail.webp, build_url)
+    return srcsets
+
+
+class AuthorSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'first_name', 'last_name')
 
-class PostSerializer(serializers.ModelSerializer):
+
+# model paths read by the expanded relations
+AUTHOR_PATHS = tuple(
+    f'author__{name}' for name in AuthorSerializer.Meta.fields
+)
+GROUP_PATHS = (
+    'group__id', 'group__title', 'group__slug', 'group__description'
+)
+
+
+class GroupSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = Group
+        fields = '__all__'
+
+
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = SlugRelatedField(
         slug_field='username',
         read_only=True,
         default=serializers.CurrentUserDefault(),
     )
+    thumbnails = serializers.SerializerMethodField()
+    srcsets = serializers.SerializerMethodField()
 
-    class Meta:
-        model = Post
-        fields = '__all__'
+    def get_thumbnails(self, post):
+        return thumbnail_urls(
+            self.context.get('request'), post.image.name, post.thumbnails
+        )
 
+    def get_srcsets(self, post):
+        return thumbnail_srcsets(
+            self.context.get('request'), post.image.name, post.thumbnails
+        )
 
-class GroupSerializer(serializers.ModelSerializer):
+    def validate_image(self, image):
+        return normalize(image) if image else image
 
     class Meta:
-        model = Group
+        model = Post
         fields = '__all__'
+        list_serializer_class = BulkCreateListSerializer
+        sources = {
+            'author': ('author__username',),
+            'thumbnails': ('image', 'thumbnails'),
+            'srcsets': ('image', 'thumbnails'),
+        }
+        expandable = {
+            'author': (AuthorSerializer, AUTHOR_PATHS),
+            'group': (GroupSerializer, GROUP_PATHS),
+        }
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = SlugRelatedField(
         slug_field='username',
         read_only=True,
@@ -35,6 +180,90 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = '__all__'
         read_only_fields = ('post',)
+        list_serializer_class = BulkCreateListSerializer
+        sources = {'author': ('author__username',)}
+        expandable = {
+            'author': (AuthorSerializer, AUTHOR_PATHS),
+        }
+
+
+class ValuesSerializer:
+    """Read-only twin of a ``SparseFieldsMixin`` serializer.
+
+    Renders ``values()`` rows into the exact representation ``serializer``
+    gives model instances. Every field is compiled once into a function
+    of the row, so there are no model instances and no per-field
+    dispatch left in the loop. Method fields need a ``get_<name>(row)``
+    here; expanded relations are not supported.
+    """
+
+    def __init__(self, serializer):
+        self.serializer = serializer
+        self.request = serializer.context.get('request')
+        self.model = serializer.Meta.model
+        self.supported = not serializer.expanded
+        self.readers = [
+            (name, self.reader(field))
+            for name, field in serializer.fields.items()
+            if not field.write_only
+        ]
+
+    def query_paths(self, always=()):
+        only, _ = self.serializer.query_plan(always)
+        return only
+
+    def reader(self, field):
+        if isinstance(field, serializers.SerializerMethodField):
+            return getattr(self, field.method_name)
+        if isinstance(field, SlugRelatedField):
+            return itemgetter(f'{field.source}__{field.slug_field}')
+        if isinstance(field, serializers.FileField):
+            return self.file_reader(field)
+        if isinstance(field, serializers.DateTimeField):
+            return self.converting_reader(field)
+        return itemgetter(field.source)
+
+    def converting_reader(self, field):
+        source, convert = field.source, field.to_representation
+
+        def read(row):
+            value = row[source]
+            return None if value is None else convert(value)
+        return read
+
+    def file_reader(self, field):
+        source, request = field.source, self.request
+        storage = self.model._meta.get_field(source).storage
+        use_url = getattr(
+            field, 'use_url', api_settings.UPLOADED_FILES_USE_URL
+        )
+
+        def read(row):
+            name = row[source]
+            if not name:
+                return None
+            if not use_url:
+                return name
+            url = storage.url(name)
+            return request.build_absolute_uri(url) if request else url
+        return read
+
+    def to_representation(self, row):
+        return {name: read(row) for name, read in self.readers}
+
+    def many(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+class PostValuesSerializer(ValuesSerializer):
+
+    def get_thumbnails(self, row):
+        return thumbnail_urls(self.request, row['image'], row['thumbnails'])
+
+    def get_srcsets(self, row):
+        return thumbnail_srcsets(
+            self.request, row['image'], row['thumbnails']
+        )
 
 
 class FollowSerializer(serializers.ModelSerializer):
@@ -44,6 +273,7 @@ class FollowSerializer(serializers.ModelSerializer):
         default=serializers.CurrentUserDefault()
     )
     following = SlugRelatedField(
+        source='author',
         slug_field='username',
         queryset=User.objects.all()
     )
@@ -55,10 +285,4 @@ class FollowSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Follow
-        fields = '__all__'
-        validators = [
-            UniqueTogetherValidator(
-                queryset=Follow.objects.all(),
-                fields=['user', 'following']
-            )
-        ]
+        fields = ('id', 'user', 'following')
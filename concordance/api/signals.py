@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import forget_user
+
+
+User = get_user_model()
+
+
+@receiver(post_init, sender=User)
+def remember_token_id(sender, instance, **kwargs):
+    # read through __dict__ so deferred loading is never triggered
+    instance._initial_token_id = instance.__dict__.get(
+        api_settings.USER_ID_FIELD
+    )
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_token_user(sender, instance, **kwargs):
+    token_id = getattr(instance, api_settings.USER_ID_FIELD)
+    # a renamed user may still be cached under the old name
+    forget_user(*{token_id, instance._initial_token_id} - {None})
+    instance._initial_token_id = token_id
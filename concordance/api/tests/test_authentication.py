@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.shortcuts import reverse
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import SlidingToken
+
+from posts.models import Post
+
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='lucy', password='pw')
+        self.post = Post.objects.create(text='text', author=self.user)
+        self.POST = reverse('api:posts-detail', args=(self.post.id,))
+        self.authorize(self.user)
+
+    def tearDown(self):
+        cache.clear()
+
+    def authorize(self, user):
+        token = SlidingToken.for_user(user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def user_queries(self, method='get', data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(self.POST, data)
+        return response, [
+            query['sql'] for query in queries
+            if 'FROM "auth_user"' in query['sql']
+            and 'JOIN' not in query['sql']
+        ]
+
+    def test_user_is_cached(self):
+        """test if the token user is looked up once"""
+        response, queries = self.user_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        response, queries = self.user_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+    def test_author_check_needs_no_query(self):
+        """test if the author permission compares ids without a lookup"""
+        self.user_queries()
+        response, queries = self.user_queries('patch', {'text': 'edited'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+    def test_deactivation(self):
+        """test if a deactivated user is rejected right away"""
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        response, _ = self.user_queries()
+        self.assertEqual(response.status_code, 401)
+
+    def test_password_change(self):
+        """test if a password change drops the cached user"""
+        self.user_queries()
+        self.user.set_password('new')
+        self.user.save()
+        _, queries = self.user_queries()
+        self.assertEqual(len(queries), 1)
+
+    def test_rename(self):
+        """test if tokens of the old username stop resolving"""
+        self.user_queries()
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'laura'
+        user.save()
+        response, _ = self.user_queries()
+        self.assertEqual(response.status_code, 401)
+
+    def test_deletion(self):
+        """test if a deleted user is rejected right away"""
+        self.user_queries()
+        User.objects.get(pk=self.user.pk).delete()
+        response, _ = self.user_queries()
+        self.assertEqual(response.status_code, 401)
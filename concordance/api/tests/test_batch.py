@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.shortcuts import reverse
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from posts.models import Comment, Follow, Post, TimelineEntry
+from posts.search import search_posts
+
+
+User = get_user_model()
+
+
+class BatchCreateTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='dale')
+        cls.follower = User.objects.create_user(username='diane')
+        Follow.objects.create(user=cls.follower, author=cls.author)
+        cls.post = Post.objects.create(text='post', author=cls.author)
+        cls.POSTS = reverse('api:posts-batch')
+        cls.COMMENTS = reverse('api:comments-batch', args=(cls.post.id,))
+
+    @classmethod
+    def tearDownClass(cls):
+        cache.clear()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client.force_authenticate(self.author)
+
+    def test_posts_batch(self):
+        """test if a batch of posts is created with derived data"""
+        response = self.client.post(
+            self.POSTS,
+            [{'text': f'batch {number}'} for number in range(3)],
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        created = [item['id'] for item in response.data]
+        self.assertEqual(
+            list(Post.objects.filter(pk__in=created).order_by('pk')
+                 .values_list('text', flat=True)),
+            ['batch 0', 'batch 1', 'batch 2'],
+        )
+        self.assertEqual(
+            [item['author'] for item in response.data], ['dale'] * 3
+        )
+        self.author.stats.refresh_from_db()
+        self.assertEqual(self.author.stats.posts_count, 4)
+        self.assertEqual(
+            TimelineEntry.objects.filter(
+                user=self.follower, post_id__in=created
+            ).count(), 3
+        )
+        self.assertEqual(search_posts('batch').count(), 3)
+
+    def test_comments_batch(self):
+        """test if a batch of comments updates the comment counter"""
+        response = self.client.post(
+            self.COMMENTS, [{'text': 'one'}, {'text': 'two'}], format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [item['post'] for item in response.data], [self.post.id] * 2
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 2)
+
+    def test_all_or_nothing(self):
+        """test if one invalid item rejects the whole batch"""
+        response = self.client.post(
+            self.POSTS, [{'text': 'fine'}, {'group': 1}], format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('text', response.data[1])
+        self.assertFalse(Post.objects.filter(text='fine').exists())
+
+    @override_settings(API_BATCH_SIZE_LIMIT=2)
+    def test_batch_limit(self):
+        """test if batches over the limit are rejected"""
+        response = self.client.post(
+            self.COMMENTS, [{'text': 'spam'}] * 3, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Comment.objects.exists())
+        response = self.client.post(self.COMMENTS, [], format='json')
+        self.assertEqual(response.status_code, 400)
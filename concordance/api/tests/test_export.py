@@ -0,0 +1,91 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.shortcuts import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from posts.models import Comment, Follow, Group, Post
+
+
+User = get_user_model()
+
+
+class ExportTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='gordon', is_staff=True)
+        cls.author = User.objects.create_user(username='shelly')
+        cls.group = Group.objects.create(title='Diner', slug='diner')
+        cls.old = Post.objects.create(text='old', author=cls.author)
+        cls.new = Post.objects.create(
+            text='new', author=cls.author, group=cls.group
+        )
+        Post.objects.filter(pk=cls.old.pk).update(
+            pub_date=timezone.now() - timedelta(days=10)
+        )
+        Comment.objects.create(post=cls.new, author=cls.staff, text='pie')
+        Follow.objects.create(user=cls.staff, author=cls.author)
+        cls.EXPORT = reverse('api:export')
+
+    @classmethod
+    def tearDownClass(cls):
+        cache.clear()
+        super().tearDownClass()
+
+    @staticmethod
+    def parse(lines):
+        return [json.loads(line) for line in lines.splitlines()]
+
+    def get_records(self, **params):
+        response = self.client.get(self.EXPORT, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        return self.parse(
+            b''.join(response.streaming_content).decode()
+        )
+
+    def test_staff_only(self):
+        """test if only staff can export"""
+        self.client.force_authenticate(self.author)
+        self.assertEqual(self.client.get(self.EXPORT).status_code, 403)
+
+    def test_full_export(self):
+        """test if every record type is streamed with natural keys"""
+        self.client.force_authenticate(self.staff)
+        records = self.get_records()
+        self.assertEqual(
+            [record['type'] for record in records],
+            ['group', 'post', 'post', 'comment', 'follow'],
+        )
+        self.assertEqual(records[2]['author'], 'shelly')
+        self.assertEqual(records[2]['group'], 'diner')
+        self.assertEqual(records[3]['post'], self.new.pk)
+        self.assertEqual(
+            records[4],
+            {'type': 'follow', 'user': 'gordon', 'author': 'shelly'},
+        )
+
+    def test_since(self):
+        """test if since= limits dated records"""
+        self.client.force_authenticate(self.staff)
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        records = self.get_records(since=since, types='post,comment')
+        self.assertEqual(
+            [(record['type'], record['text']) for record in records],
+            [('post', 'new'), ('comment', 'pie')],
+        )
+        response = self.client.get(self.EXPORT, {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        """test if the command writes the same dump"""
+        self.client.force_authenticate(self.staff)
+        output = StringIO()
+        call_command('export_data', stdout=output)
+        self.assertEqual(self.parse(output.getvalue()), self.get_records())
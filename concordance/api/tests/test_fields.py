@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.shortcuts import reverse
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from posts.models import Comment, Group, Post
+
+
+User = get_user_model()
+
+
+class SparseFieldsTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='audrey', first_name='Audrey', last_name='Horne'
+        )
+        cls.group = Group.objects.create(
+            title='Great Northern', slug='great-northern', description='Hotel'
+        )
+        cls.post = Post.objects.create(
+            text='a very long text', author=cls.author, group=cls.group
+        )
+        Comment.objects.create(post=cls.post, author=cls.author, text='hi')
+        cls.POSTS = reverse('api:posts-list')
+        cls.POST = reverse('api:posts-detail', args=(cls.post.id,))
+        cls.COMMENTS = reverse('api:comments-list', args=(cls.post.id,))
+        cls.GROUPS = reverse('api:groups-list')
+
+    @classmethod
+    def tearDownClass(cls):
+        cache.clear()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client.force_authenticate(self.author)
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in queries]
+
+    def test_fields_trim_response_and_columns(self):
+        """test if ?fields= trims the payload and the selected columns"""
+        response, queries = self.get(
+            self.POSTS, {'fields': 'id,pub_date', 'cursor': ''}
+        )
+        post, = response.data['results']
+        self.assertEqual(set(post), {'id', 'pub_date'})
+        select, = [sql for sql in queries if 'FROM "posts_post"' in sql]
+        self.assertNotIn('"posts_post"."text"', select)
+        self.assertNotIn('JOIN', select)
+
+    def test_author_needs_join_only_when_requested(self):
+        """test if the author join is kept for the author field only"""
+        response, queries = self.get(self.POST, {'fields': 'id,author'})
+        self.assertEqual(response.data, {'id': self.post.id,
+                                         'author': 'audrey'})
+        select, = [sql for sql in queries if 'FROM "posts_post"' in sql]
+        self.assertIn('"auth_user"."username"', select)
+        self.assertNotIn('"auth_user"."password"', select)
+
+    def test_expand(self):
+        """test if ?expand= nests author and group in one query"""
+        response, queries = self.get(
+            self.POST, {'fields': 'id,author,group', 'expand': 'author,group'}
+        )
+        self.assertEqual(response.data['author'], {
+            'id': self.author.id, 'username': 'audrey',
+            'first_name': 'Audrey', 'last_name': 'Horne',
+        })
+        self.assertEqual(response.data['group']['slug'], 'great-northern')
+        select, = [sql for sql in queries if 'FROM "posts_post"' in sql]
+        self.assertIn('"posts_group"."title"', select)
+
+    def test_comments_and_groups(self):
+        """test if comments and groups accept fields and expand too"""
+        response, _ = self.get(
+            self.COMMENTS, {'fields': 'text,author', 'expand': 'author'}
+        )
+        comment, = response.data['results']
+        self.assertEqual(comment['text'], 'hi')
+        self.assertEqual(comment['author']['username'], 'audrey')
+        response, _ = self.get(self.GROUPS, {'fields': 'slug'})
+        self.assertEqual(
+            response.data['results'], [{'slug': 'great-northern'}]
+        )
+
+    def test_unknown_fields_are_rejected(self):
+        """test if unknown field names fail with the valid ones listed"""
+        for url in (self.POSTS, self.POST):
+            with self.subTest(url=url):
+                response = self.client.get(url, {'fields': 'id,nope'})
+                self.assertEqual(response.status_code, 400)
+                message, = response.data['fields']
+                self.assertIn('Unknown fields: nope.', message)
+                self.assertIn('pub_date', message)
+
+    def test_unknown_expansions_are_ignored(self):
+        """test if unknown expand names neither fail nor add fields"""
+        response, _ = self.get(self.POST, {'fields': 'id', 'expand': 'x'})
+        self.assertEqual(response.data, {'id': self.post.id})
+
+    def test_writes_return_full_representation(self):
+        """test if a write ignores ?fields="""
+        response = self.client.patch(
+            f'{self.POST}?fields=id', {'text': 'edited'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['text'], 'edited')
+        self.assertIn('author', response.data)
@@ -0,0 +1,48 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.shortcuts import reverse
+from rest_framework.test import APITestCase
+
+from posts.models import Post
+
+
+User = get_user_model()
+
+
+class PostsPaginationTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='nutcase')
+        Post.objects.bulk_create(
+            Post(text=f'post {number}', author=cls.author)
+            for number in range(12)
+        )
+        cls.POSTS = reverse('api:posts-list')
+
+    def setUp(self):
+        self.client.force_authenticate(self.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        cache.clear()
+        super().tearDownClass()
+
+    def test_limit_offset_is_default(self):
+        """test if plain requests keep the limit/offset envelope"""
+        response = self.client.get(self.POSTS, {'limit': 5})
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_cursor_mode(self):
+        """test if cursor links walk every post exactly once"""
+        expected = list(Post.objects.values_list('id', flat=True))
+        response = self.client.get(self.POSTS, {'cursor': '', 'limit': 5})
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+        received = [post['id'] for post in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            received.extend(post['id'] for post in response.data['results'])
+        self.assertEqual(received, expected)
+        self.assertIsNotNone(response.data['previous'])
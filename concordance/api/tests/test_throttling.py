@@ -0,0 +1,107 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.shortcuts import reverse
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from api.throttling import UserCounterThrottle
+
+
+User = get_user_model()
+
+RATES = {'anon': '3/min', 'user': '3/min', 'token': '2/min'}
+
+
+@override_settings(THROTTLE_RATES=RATES)
+class ThrottlingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='ben', password='pw')
+        self.POSTS = reverse('api:posts-list')
+        self.now = 1000 * 60
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_posts(self, times):
+        with mock.patch.object(
+            UserCounterThrottle, 'timer', new=lambda throttle: self.now
+        ):
+            return [self.client.get(self.POSTS) for _ in range(times)]
+
+    def test_user_rate(self):
+        """test if a user is refused once the rate is used up"""
+        self.client.force_authenticate(self.user)
+        *allowed, refused = self.get_posts(4)
+        self.assertEqual(
+            [response.status_code for response in allowed], [200] * 3
+        )
+        self.assertEqual(refused.status_code, 429)
+        self.assertEqual(refused['Retry-After'], '80')
+
+    def test_window_slides(self):
+        """test if capacity comes back as the window slides on"""
+        self.client.force_authenticate(self.user)
+        self.get_posts(4)
+        # a third into the next minute the last one's 3 requests weigh 2
+        self.now += 80
+        allowed, refused = self.get_posts(2)
+        self.assertEqual(allowed.status_code, 200)
+        self.assertEqual(refused.status_code, 429)
+        self.assertEqual(refused['Retry-After'], '20')
+
+    def test_refused_requests_are_free(self):
+        """test if refused requests do not count against the client"""
+        self.client.force_authenticate(self.user)
+        self.get_posts(10)
+        self.now += 60
+        self.assertEqual(caches['throttle'].get(
+            f'throttle_user_{self.user.pk}:{int(self.now // 60) - 1}'
+        ), 3)
+
+    def test_token_rate(self):
+        """test if token issuance has its own, stricter limit"""
+        url = reverse('api:jwt-get')
+        data = {'username': 'ben', 'password': 'pw'}
+        statuses = [
+            self.client.post(url, data).status_code for _ in range(3)
+        ]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_forwarded_for_ignored(self):
+        """test if clients can not pick their address without a proxy"""
+        url = reverse('api:jwt-get')
+        data = {'username': 'ben', 'password': 'pw'}
+        statuses = [
+            self.client.post(
+                url, data, HTTP_X_FORWARDED_FOR=f'10.0.0.{number}'
+            ).status_code
+            for number in range(3)
+        ]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_forwarded_for_behind_proxy(self):
+        """test if the address the proxy appended identifies the client"""
+        url = reverse('api:jwt-get')
+        data = {'username': 'ben', 'password': 'pw'}
+        rest_framework = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+        with self.settings(REST_FRAMEWORK=rest_framework):
+            statuses = [
+                self.client.post(
+                    url, data, HTTP_X_FORWARDED_FOR=f'10.0.0.1, {address}'
+                ).status_code
+                for address in ('10.0.0.2', '10.0.0.3', '10.0.0.2')
+            ]
+        self.assertEqual(statuses, [200, 200, 200])
+
+    @override_settings(THROTTLE_ENABLED=False)
+    def test_disabled(self):
+        """test if throttling can be switched off"""
+        self.client.force_authenticate(self.user)
+        responses = self.get_posts(5)
+        self.assertEqual(
+            {response.status_code for response in responses}, {200}
+        )
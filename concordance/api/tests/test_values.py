@@ -0,0 +1,164 @@
+import datetime as dt
+import decimal
+import io
+import json
+import shutil
+import tempfile
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.shortcuts import reverse
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from api.renderers import FastJSONRenderer
+from api.views import CommentsViewset, PostsViewset
+from posts.models import Comment, Group, Post
+
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ValuesReadTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='hawk')
+        group = Group.objects.create(
+            title='Bookhouse', slug='bookhouse', description='Boys'
+        )
+        cls.post = Post.objects.create(
+            text='owls   are not', author=cls.author, group=group,
+            image=SimpleUploadedFile('owl.gif', SMALL_GIF, 'image/gif'),
+        )
+        Post.objects.create(text='plain', author=cls.author)
+        Comment.objects.create(post=cls.post, author=cls.author, text='ok')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        cache.clear()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client.force_authenticate(self.author)
+
+    def assertSameBytes(self, viewset, url, params=None):
+        fast = self.client.get(url, params)
+        with mock.patch.object(viewset, 'values_serializer_class', None):
+            regular = self.client.get(url, params)
+        self.assertEqual(fast.status_code, 200)
+        self.assertEqual(fast.content, regular.content)
+
+    def test_posts_match_model_serializer(self):
+        """test if values() rows render the same bytes as the serializer"""
+        posts = reverse('api:posts-list')
+        self.assertSameBytes(PostsViewset, posts)
+        self.assertSameBytes(PostsViewset, posts, {'cursor': ''})
+        self.assertSameBytes(PostsViewset, posts, {'fields': 'id,author'})
+        self.assertSameBytes(PostsViewset, posts, {'q': 'owls'})
+        self.assertSameBytes(
+            PostsViewset, reverse('api:posts-detail', args=(self.post.id,))
+        )
+
+    def test_comments_match_model_serializer(self):
+        """test if comments render the same bytes on both paths"""
+        self.assertSameBytes(
+            CommentsViewset, reverse('api:comments-list', args=(self.post.id,))
+        )
+        comment = self.post.comments.get()
+        self.assertSameBytes(
+            CommentsViewset,
+            reverse('api:comments-detail', args=(self.post.id, comment.id)),
+        )
+
+    def test_single_query(self):
+        """test if a keyset page of posts is one query"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('api:posts-list'), {'cursor': ''})
+        self.assertEqual(len(queries), 1)
+
+    def test_expand_takes_regular_path(self):
+        """test if expanded relations still render"""
+        response = self.client.get(
+            reverse('api:posts-detail', args=(self.post.id,)),
+            {'expand': 'author'},
+        )
+        self.assertEqual(response.data['author']['username'], 'hawk')
+
+    def test_missing_post(self):
+        """test if an unknown post is still a 404"""
+        response = self.client.get(reverse('api:posts-detail', args=(0,)))
+        self.assertEqual(response.status_code, 404)
+
+
+class FastJSONRendererTests(APITestCase):
+    def test_same_bytes_as_json_renderer(self):
+        """test if orjson output is byte compatible with JSONRenderer"""
+        data = {
+            'text': 'café     "quoted"',
+            'when': timezone.make_aware(
+                dt.datetime(2020, 1, 2, 3, 4, 5, 6789)
+            ),
+            'day': dt.date(2020, 1, 2),
+            'price': decimal.Decimal('1.10'),
+            'uuid': uuid.UUID(int=1),
+            'items': [1, None, True, 2.5, (1, 2)],
+        }
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_fallback(self):
+        """test if data orjson rejects is rendered by the stdlib encoder"""
+        data = {1: 'non string key', 'big': 2 ** 70}
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_indent(self):
+        """test if indented output is left to JSONRenderer"""
+        context = {'indent': 2}
+        self.assertEqual(
+            FastJSONRenderer().render({'a': 1}, renderer_context=context),
+            JSONRenderer().render({'a': 1}, renderer_context=context),
+        )
+
+
+class BenchmarkCommandTests(APITestCase):
+    def test_benchmark(self):
+        """test if the benchmark reports both serialization paths"""
+        author = User.objects.create_user(username='pete')
+        Post.objects.bulk_create(
+            Post(text=f'post {number}', author=author) for number in range(5)
+        )
+        with tempfile.NamedTemporaryFile('r', suffix='.json') as output:
+            call_command(
+                'bench_serializers', rows=5, repeat=2, output=output.name,
+                stdout=io.StringIO(),
+            )
+            report = json.load(output)
+        self.assertEqual(
+            set(report['posts']), {'serializer', 'values', 'speedup'}
+        )
+        self.assertIn('json', report['render'])
@@ -0,0 +1,25 @@
+"""API throttles on the atomic cache counters of ``core.throttling``."""
+from rest_framework import throttling
+
+from core.throttling import CounterThrottleMixin
+
+
+class AnonCounterThrottle(CounterThrottleMixin, throttling.AnonRateThrottle):
+    """Anonymous clients, by address."""
+
+
+class UserCounterThrottle(CounterThrottleMixin, throttling.UserRateThrottle):
+    """Authenticated users by id, anonymous clients by address."""
+
+
+class TokenCounterThrottle(
+        CounterThrottleMixin, throttling.SimpleRateThrottle):
+    """Token issuance and refresh, by address whoever asks."""
+
+    scope = 'token'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
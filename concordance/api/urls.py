@@ -4,7 +4,10 @@ from rest_framework.authtoken import views
 from djoser.views import UserViewSet
 from rest_framework_simplejwt.views import TokenObtainSlidingView, TokenRefreshSlidingView
 
-from api.views import PostsViewset, GroupsViewset, CommentsViewset, FollowViewSet
+from api.throttling import TokenCounterThrottle
+from api.views import (
+    PostsViewset, GroupsViewset, CommentsViewset, FollowViewSet, ExportView
+)
 
 app_name = 'api'
 
@@ -24,7 +27,20 @@ v1_router.register(
 )
 
 urlpatterns = [
+    path('v1/export/', ExportView.as_view(), name='export'),
     path('v1/', include(v1_router.urls)),
-    path('token/get/', TokenObtainSlidingView.as_view(), name='jwt-get'),
-    path('token/refresh/', TokenRefreshSlidingView.as_view(), name='jwt-refresh')
+    path(
+        'token/get/',
+        TokenObtainSlidingView.as_view(
+            throttle_classes=[TokenCounterThrottle]
+        ),
+        name='jwt-get'
+    ),
+    path(
+        'token/refresh/',
+        TokenRefreshSlidingView.as_view(
+            throttle_classes=[TokenCounterThrottle]
+        ),
+        name='jwt-refresh'
+    )
 ]
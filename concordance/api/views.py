@@ -1,45 +1,90 @@
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
 from rest_framework import viewsets, filters, mixins
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.views import APIView
 
-from posts.models import Post, Group
-from api.serializers import PostSerializer, GroupSerializer, CommentSerializer, FollowSerializer
+from posts import export
+from posts.models import Comment, Follow, Post, Group
+from api.serializers import (
+    PostSerializer, GroupSerializer, CommentSerializer, FollowSerializer,
+    PostValuesSerializer, ValuesSerializer,
+)
 from api.permissions import IsAuthorOrReadOnly
+from api.pagination import CommentsPagination, KeysetOrLimitOffsetPagination
+from api.filters import FullTextSearchFilter
+from api.mixins import (
+    BatchCreateMixin, ConditionalGetMixin, SparseFieldsetMixin,
+    ValuesReadMixin,
+)
 
 
-class PostsViewset(viewsets.ModelViewSet):
+class PostsViewset(
+        BatchCreateMixin, ConditionalGetMixin, ValuesReadMixin,
+        SparseFieldsetMixin, viewsets.ModelViewSet):
     """All posts."""
-    queryset = Post.objects.all()
+    queryset = Post.objects.select_related('author')
+    query_keys = ('id', 'pub_date')
     serializer_class = PostSerializer
+    values_serializer_class = PostValuesSerializer
     permission_classes = [IsAuthorOrReadOnly]
-    pagination_class = LimitOffsetPagination
-    filter_backends = [filters.SearchFilter]
+    pagination_class = KeysetOrLimitOffsetPagination
+    filter_backends = [filters.SearchFilter, FullTextSearchFilter]
     search_fields = ['author__username']
 
+    def get_scopes(self):
+        if self.action == 'retrieve':
+            return [f'post:{self.kwargs["pk"]}']
+        # list items carry comments_count
+        return ['index', 'comments']
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
 
-class GroupsViewset(viewsets.ReadOnlyModelViewSet):
+class GroupsViewset(
+        ConditionalGetMixin, SparseFieldsetMixin,
+        viewsets.ReadOnlyModelViewSet):
     """All groups."""
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
 
+    def get_scopes(self):
+        return ['groups']
+
 
-class CommentsViewset(viewsets.ModelViewSet):
+class CommentsViewset(
+        BatchCreateMixin, ConditionalGetMixin, ValuesReadMixin,
+        SparseFieldsetMixin, viewsets.ModelViewSet):
     """All comments related to specified post."""
+    queryset = Comment.objects.select_related('author').order_by(
+        'pub_date', 'id'
+    )
+    query_keys = ('id', 'pub_date')
     serializer_class = CommentSerializer
+    values_serializer_class = ValuesSerializer
     permission_classes = [IsAuthorOrReadOnly]
+    pagination_class = CommentsPagination
 
-    def get_post(self):
+    def get_scopes(self):
+        return [f'post:{self.kwargs["post_id"]}']
+
+    @cached_property
+    def commented_post(self):
+        # not "post", which DRF dispatches POST requests to
         return get_object_or_404(
-            Post.objects.all(),
+            Post.objects.only('id'),
             id=self.kwargs.get('post_id')
         )
 
+    def get_post(self):
+        return self.commented_post
+
     def get_queryset(self):
-        return self.get_post().comments
+        return super().get_queryset().filter(post=self.get_post())
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, post=self.get_post())
@@ -54,11 +99,44 @@ class FollowViewSet(
     serializer_class = FollowSerializer 
     permission_classes = [IsAuthenticated] 
     filter_backends = [filters.SearchFilter] 
-    search_fields = ['following__username'] 
+    search_fields = ['author__username']
+
+    def get_queryset(self):
+        return Follow.objects.filter(user=self.request.user).select_related(
+            'user', 'author'
+        ).order_by('id')
+
+    def perform_create(self, serializer):
+        try:
+            with transaction.atomic():
+                serializer.save(user=self.request.user)
+        except IntegrityError:
+            # already following
+            raise ValidationError({'following': ['Already following']})
 
-    def get_queryset(self): 
-        return self.request.user.following.all() 
 
-    def perform_create(self, serializer): 
-        serializer.save(user=self.request.user)
-        
+class ExportView(APIView):
+    """Stream every post, comment, follow and group as NDJSON.
+
+    ``?since=`` limits dated rows to those published at or after it,
+    ``?types=post,comment`` picks record types.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since:
+            since = export.parse_since(since)
+            if since is None:
+                raise ValidationError({'since': ['Invalid date.']})
+        types = request.query_params.get('types')
+        types = types.split(',') if types else list(export.TYPES)
+        unknown = set(types) - set(export.TYPES)
+        if unknown:
+            raise ValidationError(
+                {'types': [f'Unknown types: {", ".join(sorted(unknown))}.']}
+            )
+        return StreamingHttpResponse(
+            export.ndjson(types, since or None),
+            content_type='application/x-ndjson',
+        )
@@ -14,16 +14,32 @@ ALLOWED_HOSTS = ['127.0.0.1']
 
 DEBUG = False
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'TIMEOUT': 600,
-        'OPTIONS': {
-            'MAX_ENTRIES': 100,
-            'CULL_FREQUESNCY': 4,
-        },
+# feed versions, conditional GET validators, cached JWT users, the follow
+# graph and throttle counters are only coherent when every worker process
+# shares one cache; LocMemCache is per process and only fits a single one
+# (runserver, tests), e.g. MEMCACHED_LOCATION=memcached:11211
+MEMCACHED_LOCATION = os.getenv('MEMCACHED_LOCATION')
+if MEMCACHED_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': MEMCACHED_LOCATION.split(','),
+            'TIMEOUT': 600,
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'TIMEOUT': 600,
+            'OPTIONS': {
+                'MAX_ENTRIES': 1000,
+                'CULL_FREQUENCY': 4,
+            },
+        }
+    }
+# throttle counters, see core.throttling
+CACHES['throttle'] = {**CACHES['default'], 'KEY_PREFIX': 'throttle'}
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -40,10 +56,13 @@ INSTALLED_APPS = [
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
+    'api.apps.ApiConfig',
     'about.apps.AboutConfig',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.QueryBudgetMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -54,27 +73,63 @@ MIDDLEWARE = [
     'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# record per-view SQL stats and expose them in X-Query-* headers
+QUERY_BUDGET = os.getenv('QUERY_BUDGET', str(DEBUG)).lower() in ('1', 'true')
+
 ROOT_URLCONF = 'concordance.urls'
 
+# one of TEMPLATE_PROFILES below
+TEMPLATE_PROFILE = os.getenv(
+    'TEMPLATE_PROFILE', 'development' if DEBUG else 'production'
+)
+
+# debug_toolbar only looks for APP_DIRS, which cannot be combined with
+# explicit loaders; the app_directories loader below serves its templates
+SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W006']
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+TEMPLATE_CONTEXT_PROCESSORS = [
+    'django.template.context_processors.request',
+    'django.contrib.auth.context_processors.auth',
+    'django.contrib.messages.context_processors.messages',
+    'core.context_processors.year.year',
+]
+# production caches compiled templates for the life of the process and
+# leaves out debug-only context processors; development reloads
+# templates from disk on every render
+TEMPLATE_PROFILES = {
+    'production': {
+        'loaders': [
+            ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+        ],
+        'context_processors': TEMPLATE_CONTEXT_PROCESSORS,
+        'debug': False,
+    },
+    'development': {
+        'loaders': TEMPLATE_LOADERS,
+        'context_processors': [
+            'django.template.context_processors.debug',
+            *TEMPLATE_CONTEXT_PROCESSORS,
+        ],
+        'debug': True,
+    },
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
-        'OPTIONS': {
-            'context_processors': [
-                'django.template.context_processors.debug',
-                'django.template.context_processors.request',
-                'django.contrib.auth.context_processors.auth',
-                'django.contrib.messages.context_processors.messages',
-                'core.context_processors.year.year',
-            ],
-        },
+        'OPTIONS': TEMPLATE_PROFILES[TEMPLATE_PROFILE],
     },
 ]
 
 STATIC_URL = '/static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'static')
+# hashed names plus .gz (and .br) copies, served by nginx with gzip_static
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -83,11 +138,48 @@ WSGI_APPLICATION = 'concordance.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # keep connections, and the pragmas applied to them, across requests
+        'CONN_MAX_AGE': int(os.getenv('CONN_MAX_AGE', 600)),
+        'OPTIONS': {
+            # seconds a writer waits for the lock before "database is locked"
+            'timeout': 20,
+        },
     }
 }
 
+# read-only copies of the default database refreshed by sync_replicas,
+# e.g. SQLITE_REPLICAS=/data/replica1.sqlite3,/data/replica2.sqlite3
+DATABASES.update({
+    f'replica{number}': {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
+    }
+    for number, path in enumerate(
+        filter(None, os.getenv('SQLITE_REPLICAS', '').split(',')), 1
+    )
+})
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+# views whose safe requests may read from a replica
+REPLICA_VIEW_MODULES = ('posts.views', 'api.views')
+# how long a client that wrote keeps reading from the primary
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 10))
+
+# applied to every new SQLite connection, see core.db
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'cache_size': -20000,
+    'temp_store': 'memory',
+}
+# reruns of a write transaction that found the database locked
+SQLITE_BUSY_RETRIES = 3
+SQLITE_BUSY_BACKOFF = 0.05
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -120,6 +212,36 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+
+# feed pages are invalidated by version bumps, the timeout only bounds
+# how long orphaned entries occupy the cache
+FEED_CACHE_TIMEOUT = 60 * 60
+# rendered post cards, invalidated the same way, see posts.cards
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# followed author ids and followers counts, written through by follows
+FOLLOW_GRAPH_CACHE_TIMEOUT = 60 * 60
+
+# authors above this many followers are merged into timelines at read time
+TIMELINE_FANOUT_LIMIT = 1000
+# how many of an author's latest posts a new follower receives
+TIMELINE_BACKFILL = 500
+
+POST_THUMBNAILS = {
+    'preview': ('300x300', {'upscale': False}),
+    'cover': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+# pixel densities rendered per geometry, for srcset
+POST_THUMBNAIL_DENSITIES = (1, 2)
+# 0 renders thumbnails synchronously once the upload commits
+THUMBNAIL_WORKERS = 2
+
+# uploads are downscaled to fit this many pixels per side and re-encoded
+POST_IMAGE_MAX_SIZE = 1920
+POST_IMAGE_QUALITY = 85
+# WebP siblings of every thumbnail, where Pillow is built with WebP
+POST_IMAGE_WEBP = True
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
@@ -135,15 +257,44 @@ MESSAGE_TAGS = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.AnonCounterThrottle',
+        'api.throttling.UserCounterThrottle',
+    ],
+    # proxies appending to X-Forwarded-For, 1 behind the nginx of
+    # docker-compose; with 0 the header is ignored, as any client can
+    # forge it when no proxy in front rewrites it
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
+# requests per client and period, see core.throttling; the API scopes
+# (anon, user, token) and the HTML write views (comment, follow)
+THROTTLE_ENABLED = True
+THROTTLE_RATES = {
+    'anon': '300/min',
+    'user': '1200/min',
+    'token': '20/min',
+    'comment': '30/min',
+    'follow': '60/min',
+}
+
+# most items a single batch create request may carry
+API_BATCH_SIZE_LIMIT = 100
+
+# seconds a user resolved from a JWT is cached, see api.authentication
+JWT_USER_CACHE_TIMEOUT = 60
+
 SIMPLE_JWT = {
     'USER_ID_FIELD': 'username',
     'SLIDING_TOKEN_LIFETIME': timedelta(hours=6),
@@ -1,7 +1,13 @@
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'concordance.settings')
 
 application = get_wsgi_application()
+
+if settings.TEMPLATE_PROFILE == 'production':
+    # parse every template once per worker, before the first request
+    from core.templating import precompile
+    precompile()
@@ -0,0 +1,19 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite backend able to open write transactions as IMMEDIATE.
+
+    A deferred transaction that reads before it writes has to upgrade
+    its lock, and fails at once with "database is locked" if another
+    process committed in between. While ``begin_immediate`` is set,
+    transactions take the write lock up front, so concurrent writers
+    queue on the busy timeout instead. ``core.db.retry_on_busy`` sets it.
+    """
+    begin_immediate = False
+
+    def _start_transaction_under_autocommit(self):
+        if self.begin_immediate:
+            self.cursor().execute('BEGIN IMMEDIATE')
+        else:
+            super()._start_transaction_under_autocommit()
@@ -0,0 +1,76 @@
+"""SQLite tuning for several application processes sharing one file.
+
+``apply_pragmas`` runs ``SQLITE_PRAGMAS`` on every new connection: WAL
+lets readers and the single writer work side by side, and a busy timeout
+makes writers queue instead of failing. ``retry_on_busy`` opens write
+transactions as IMMEDIATE (see ``core.backends.sqlite3``) and reruns one
+that still finds the database locked a few times, with a randomized
+backoff, before giving up.
+"""
+import logging
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+)
+
+
+logger = logging.getLogger(__name__)
+
+BUSY_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """``connection_created`` receiver applying ``SQLITE_PRAGMAS``."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_busy(error):
+    return any(message in str(error) for message in BUSY_MESSAGES)
+
+
+def retry_on_busy(function=None, using=None):
+    """Run ``function`` in a transaction, retried while the database is busy.
+
+    Only outermost transactions are retried: inside an enclosing atomic
+    block the error propagates to whoever owns that transaction. The
+    write lock is held for as long as ``function`` runs, so wrap the
+    write itself rather than a whole view.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            alias = using or DEFAULT_DB_ALIAS
+            connection = connections[alias]
+            attempts = settings.SQLITE_BUSY_RETRIES + 1
+            for attempt in range(attempts):
+                outermost = not connection.in_atomic_block
+                if outermost:
+                    connection.begin_immediate = True
+                try:
+                    with transaction.atomic(using=alias):
+                        connection.begin_immediate = False
+                        return function(*args, **kwargs)
+                except OperationalError as error:
+                    if (not is_busy(error) or attempt == attempts - 1
+                            or not outermost):
+                        raise
+                    delay = settings.SQLITE_BUSY_BACKOFF * 2 ** attempt
+                    logger.info(
+                        'database busy in %s, retry %d in %.3fs',
+                        function.__qualname__, attempt + 1, delay,
+                    )
+                    time.sleep(random.uniform(0, delay))
+                finally:
+                    connection.begin_immediate = False
+        return wrapper
+    if function is None:
+        return decorator
+    return decorator(function)
@@ -0,0 +1,278 @@
+"""Replay a weighted traffic mix against the WSGI application.
+
+Every scenario targets one named route of ``posts.urls`` or ``api.urls``
+and is called in-process through the real WSGI handler, middleware
+included, so the numbers cover everything but the network and the
+application server.
+"""
+import io
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.shortcuts import reverse
+from django.test import Client
+from django.utils.crypto import get_random_string
+from rest_framework_simplejwt.tokens import SlidingToken
+
+from posts.models import Comment, Group, Post, User
+
+
+Scenario = namedtuple('Scenario', 'route method weight client write build')
+
+# djoser account management: sends mail or changes credentials
+SKIPPED_ROUTES = {
+    'api:users-activation', 'api:users-resend-activation',
+    'api:users-reset-password', 'api:users-reset-password-confirm',
+    'api:users-reset-username', 'api:users-reset-username-confirm',
+    'api:users-set-password', 'api:users-set-username',
+    # staff only full dumps
+    'api:export',
+}
+
+
+def _no_args(fixtures):
+    return (), None
+
+
+# (route, method, weight, client, write, build): ``build`` returns the
+# URL arguments and the query or body data of one request
+SCENARIOS = [Scenario(*scenario) for scenario in (
+    ('posts:index', 'GET', 30, 'html', False, _no_args),
+    ('posts:group_list', 'GET', 8, 'html', False,
+     lambda f: ((f.pick(f.groups),), None)),
+    ('posts:profile', 'GET', 10, 'html', False,
+     lambda f: ((f.pick(f.usernames),), None)),
+    ('posts:post_detail', 'GET', 15, 'html', False,
+     lambda f: ((f.pick(f.posts),), None)),
+    ('posts:post_comments', 'GET', 3, 'html', False,
+     lambda f: ((f.pick(f.posts),), None)),
+    ('posts:follow_index', 'GET', 8, 'html', False, _no_args),
+    ('posts:search', 'GET', 4, 'html', False,
+     lambda f: ((), {'q': f.pick(f.words)})),
+    ('posts:post_create', 'GET', 1, 'html', False, _no_args),
+    ('posts:post_create', 'POST', 1, 'html', True,
+     lambda f: ((), {'text': 'load test post'})),
+    ('posts:post_edit', 'GET', 1, 'html', False,
+     lambda f: ((f.pick(f.own),), None)),
+    ('posts:post_edit', 'POST', 1, 'html', True,
+     lambda f: ((f.pick(f.own),), {'text': 'load test edit'})),
+    ('posts:add_comment', 'POST', 2, 'html', True,
+     lambda f: ((f.pick(f.posts),), {'text': 'load test comment'})),
+    ('posts:profile_follow', 'GET', 1, 'html', True,
+     lambda f: ((f.pick(f.usernames),), None)),
+    ('posts:profile_unfollow', 'GET', 1, 'html', True,
+     lambda f: ((f.pick(f.usernames),), None)),
+    ('api:api-root', 'GET', 1, 'api', False, _no_args),
+    ('api:posts-list', 'GET', 10, 'api', False, _no_args),
+    ('api:posts-list', 'POST', 1, 'api', True,
+     lambda f: ((), {'text': 'load test post'})),
+    ('api:posts-batch', 'POST', 1, 'api', True,
+     lambda f: ((), [{'text': f'load test batch {n}'} for n in range(10)])),
+    ('api:posts-detail', 'GET', 5, 'api', False,
+     lambda f: ((f.pick(f.posts),), None)),
+    ('api:posts-detail', 'PATCH', 1, 'api', True,
+     lambda f: ((f.pick(f.own),), {'text': 'load test edit'})),
+    ('api:groups-list', 'GET', 2, 'api', False, _no_args),
+    ('api:groups-detail', 'GET', 1, 'api', False,
+     lambda f: ((f.pick(f.group_ids),), None)),
+    ('api:comments-list', 'GET', 4, 'api', False,
+     lambda f: ((f.pick(f.posts),), None)),
+    ('api:comments-list', 'POST', 1, 'api', True,
+     lambda f: ((f.pick(f.posts),), {'text': 'load test comment'})),
+    ('api:comments-batch', 'POST', 1, 'api', True,
+     lambda f: ((f.pick(f.posts),), [{'text': 'load test'}] * 10)),
+    ('api:comments-detail', 'GET', 1, 'api', False,
+     lambda f: (f.pick(f.comments), None)),
+    ('api:follow-list', 'GET', 2, 'api', False, _no_args),
+    ('api:users-list', 'GET', 1, 'api', False, _no_args),
+    ('api:users-me', 'GET', 1, 'api', False, _no_args),
+    ('api:users-detail', 'GET', 1, 'api', False,
+     lambda f: ((f.actor.pk,), None)),
+    ('api:jwt-get', 'POST', 1, None, False,
+     lambda f: ((), {'username': f.actor.username, 'password': f.password})),
+    ('api:jwt-refresh', 'POST', 1, None, False,
+     lambda f: ((), {'token': f.token})),
+)]
+
+
+class Fixtures:
+    """Existing rows the scenarios pick their URLs from."""
+
+    def __init__(self, actor, password, sample=1000, seed=0):
+        self.random = random.Random(seed)
+        self.actor = actor
+        self.password = password
+        self.token = str(SlidingToken.for_user(actor))
+        posts = Post.objects.order_by('-pub_date')
+        self.posts = list(posts.values_list('pk', flat=True)[:sample])
+        self.own = list(
+            posts.filter(author=actor).values_list('pk', flat=True)[:sample]
+        )
+        self.usernames = list(
+            User.objects.exclude(pk=actor.pk)
+            .values_list('username', flat=True)[:sample]
+        )
+        groups = Group.objects.values_list('pk', 'slug')[:sample]
+        self.group_ids = [pk for pk, _ in groups]
+        self.groups = [slug for _, slug in groups]
+        self.comments = list(
+            Comment.objects.values_list('post_id', 'pk')[:sample]
+        )
+        self.words = [
+            word for text in posts.values_list('text', flat=True)[:50]
+            for word in text.split()[:3]
+        ] or ['post']
+
+    def pick(self, values):
+        return self.random.choice(values)
+
+    def missing(self):
+        """Fixture lists a scenario would have to pick from but are empty."""
+        return [
+            name for name in (
+                'posts', 'own', 'usernames', 'groups', 'comments'
+            )
+            if not getattr(self, name)
+        ]
+
+
+class LoadDriver:
+    def __init__(self, fixtures, scenarios=SCENARIOS, read_only=False):
+        self.fixtures = fixtures
+        self.scenarios = [
+            scenario for scenario in scenarios
+            if not (read_only and scenario.write)
+        ]
+        self.application = WSGIHandler()
+        self.session = self._login(fixtures.actor)
+        self.csrf_token = get_random_string(64)
+        self.lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+
+    @staticmethod
+    def _login(user):
+        client = Client()
+        client.force_login(user)
+        return client.cookies[settings.SESSION_COOKIE_NAME].value
+
+    def environ(self, scenario):
+        args, data = scenario.build(self.fixtures)
+        path = reverse(scenario.route, args=args)
+        environ = {
+            'REQUEST_METHOD': scenario.method,
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SCRIPT_NAME': '',
+            'SERVER_NAME': settings.ALLOWED_HOSTS[0],
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': io.StringIO(),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        if scenario.client == 'html':
+            environ['HTTP_COOKIE'] = (
+                f'{settings.SESSION_COOKIE_NAME}={self.session}; '
+                f'{settings.CSRF_COOKIE_NAME}={self.csrf_token}'
+            )
+        elif scenario.client == 'api':
+            environ['HTTP_AUTHORIZATION'] = f'Bearer {self.fixtures.token}'
+        if data is None:
+            return environ
+        if scenario.method == 'GET':
+            environ['QUERY_STRING'] = urlencode(data)
+            return environ
+        if scenario.client == 'html':
+            body = urlencode(
+                {**data, 'csrfmiddlewaretoken': self.csrf_token}
+            ).encode()
+            environ['CONTENT_TYPE'] = 'application/x-www-form-urlencoded'
+        else:
+            body = json.dumps(data).encode()
+            environ['CONTENT_TYPE'] = 'application/json'
+        environ['CONTENT_LENGTH'] = str(len(body))
+        environ['wsgi.input'] = io.BytesIO(body)
+        return environ
+
+    def call(self, scenario):
+        environ = self.environ(scenario)
+        status = []
+        start = time.perf_counter()
+        body = self.application(
+            environ, lambda code, headers: status.append(code)
+        )
+        try:
+            for _ in body:
+                pass
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+        elapsed = time.perf_counter() - start
+        name = f'{scenario.method} {scenario.route}'
+        with self.lock:
+            self.timings[name].append(elapsed)
+            self.statuses[name][int(status[0].split()[0])] += 1
+
+    def run(self, requests, concurrency=1):
+        plan = self.fixtures.random.choices(
+            self.scenarios,
+            weights=[scenario.weight for scenario in self.scenarios],
+            k=requests,
+        )
+        # make sure every route is exercised at least once
+        plan[:0] = self.scenarios
+        start = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                for _ in executor.map(self.call, plan):
+                    pass
+        else:
+            for scenario in plan:
+                self.call(scenario)
+        return self.report(time.perf_counter() - start)
+
+    def report(self, duration):
+        endpoints = {}
+        for name in sorted(self.timings):
+            timings = sorted(self.timings[name])
+            endpoints[name] = {
+                'requests': len(timings),
+                'errors': sum(
+                    count for code, count in self.statuses[name].items()
+                    if code >= 500
+                ),
+                'statuses': {
+                    str(code): count
+                    for code, count in sorted(self.statuses[name].items())
+                },
+                'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+                'p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+                'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+                'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+                'throughput_rps': round(len(timings) / duration, 2),
+            }
+        total = sum(len(timings) for timings in self.timings.values())
+        return {
+            'requests': total,
+            'duration_s': round(duration, 3),
+            'throughput_rps': round(total / duration, 2) if duration else 0,
+            'endpoints': endpoints,
+        }
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted ``values``."""
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
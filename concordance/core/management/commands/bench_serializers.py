@@ -0,0 +1,101 @@
+import json
+import timeit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from api import renderers
+from api.serializers import (
+    CommentSerializer, PostSerializer, PostValuesSerializer, ValuesSerializer
+)
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Time the model and values() serializers of the API list pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=100, help='Rows per serialized page',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Runs per measurement, the fastest one is kept',
+        )
+        parser.add_argument(
+            '--output', help='Write the JSON result to this file',
+        )
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        if not Post.objects.exists():
+            raise CommandError('No posts to serialize, seed the database')
+        request = Request(RequestFactory().get(
+            '/api/v1/posts/', SERVER_NAME=settings.ALLOWED_HOSTS[0]
+        ))
+        context = {'request': request}
+        self.best = lambda function: min(
+            timeit.repeat(function, number=1, repeat=repeat)
+        ) * 1000
+
+        result = {'rows': rows, 'repeat': repeat}
+        result['posts'] = self.compare(
+            PostSerializer, PostValuesSerializer,
+            Post.objects.select_related('author'), context, rows,
+        )
+        result['comments'] = self.compare(
+            CommentSerializer, ValuesSerializer,
+            Comment.objects.select_related('author'), context, rows,
+        )
+        data = PostSerializer(
+            Post.objects.select_related('author')[:rows],
+            many=True, context=context,
+        ).data
+        result['render'] = {
+            'json': round(self.best(lambda: JSONRenderer().render(data)), 3),
+            'orjson': round(self.best(
+                lambda: renderers.FastJSONRenderer().render(data)
+            ), 3) if renderers.orjson else None,
+        }
+
+        for name in ('posts', 'comments'):
+            stats = result[name]
+            self.stdout.write(
+                f"{name:<10} serializer {stats['serializer']:>9.3f}ms "
+                f"values {stats['values']:>9.3f}ms "
+                f"x{stats['speedup']}"
+            )
+        output = json.dumps(result, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def compare(self, serializer_class, values_class, queryset, context,
+                rows):
+        """Time one page through each path, query included."""
+        values = values_class(serializer_class(context=context))
+        paths = values.query_paths(('id', 'pub_date'))
+
+        def regular():
+            return serializer_class(
+                queryset[:rows], many=True, context=context
+            ).data
+
+        def fast():
+            return values.many(queryset.values(*paths)[:rows])
+
+        if JSONRenderer().render(regular()) != JSONRenderer().render(fast()):
+            raise CommandError(
+                f'{serializer_class.__name__} output differs between paths'
+            )
+        serializer, fast = self.best(regular), self.best(fast)
+        return {
+            'serializer': round(serializer, 3),
+            'values': round(fast, 3),
+            'speedup': round(serializer / fast, 2) if fast else None,
+        }
@@ -0,0 +1,103 @@
+import json
+import timeit
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.test import RequestFactory
+from django.utils import timezone
+
+from core.templating import precompile, profile_backend
+from posts.models import Group, Post, User
+
+PROFILES = ('development', 'production')
+
+
+def sample_posts(count):
+    """Unsaved posts with their author and group, rendering needs no DB."""
+    now = timezone.now()
+    posts = []
+    for number in range(1, count + 1):
+        author = User(
+            id=number, username=f'author{number}',
+            first_name='Dale', last_name=f'Cooper {number}',
+        )
+        group = Group(id=number, title=f'Group {number}', slug=f'g{number}')
+        posts.append(Post(
+            id=number, text=f'Post number {number} ' * 10,
+            author=author, group=group, pub_date=now,
+        ))
+    return posts
+
+
+class Command(BaseCommand):
+    help = 'Time rendering posts/index.html under both template profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, nargs='+', default=[10, 50, 100],
+            help='Posts per rendered page',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Runs per measurement, the fastest one is kept',
+        )
+        parser.add_argument(
+            '--output', help='Write the JSON result to this file',
+        )
+
+    def handle(self, *args, **options):
+        cache = caches['default']
+        if not isinstance(cache, LocMemCache):
+            # clearing a shared cache would flush every worker's entries
+            raise CommandError(
+                'The benchmark clears the default cache between renders '
+                'and only runs against a local-memory cache.'
+            )
+        repeat = options['repeat']
+        request = RequestFactory().get(
+            '/', SERVER_NAME=settings.ALLOWED_HOSTS[0]
+        )
+        request.user = AnonymousUser()
+        templates = settings.TEMPLATES[0]
+        backends = {
+            profile: profile_backend(profile, templates['DIRS'])
+            for profile in PROFILES
+        }
+        result = {'repeat': repeat, 'posts': {}}
+        result['precompiled'] = precompile(backends['production'].engine)
+
+        for count in options['posts']:
+            page = Paginator(sample_posts(count), count).page(1)
+            stats = {}
+            for profile, backend in backends.items():
+                def render():
+                    # cards are cached across requests, so clear them to
+                    # time the whole page rather than the cache lookups
+                    cache.clear()
+                    backend.get_template('posts/index.html').render(
+                        {'page_obj': page, 'index': True}, request
+                    )
+                stats[profile] = round(min(
+                    timeit.repeat(render, number=1, repeat=repeat)
+                ) * 1000, 3)
+            stats['speedup'] = round(
+                stats['development'] / stats['production'], 2
+            ) if stats['production'] else None
+            result['posts'][str(count)] = stats
+            self.stdout.write(
+                f"{count:>4} posts development {stats['development']:>9.3f}ms"
+                f" production {stats['production']:>9.3f}ms"
+                f" x{stats['speedup']}"
+            )
+        cache.clear()
+
+        output = json.dumps(result, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
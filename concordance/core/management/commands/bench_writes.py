@@ -0,0 +1,154 @@
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+from core.db import is_busy, retry_on_busy
+from posts.models import Comment, Post, User
+
+
+PROFILES = ('default', 'tuned')
+
+
+def comment(rng, user_ids, post_ids):
+    """One add_comment style transaction: read the post, write a comment."""
+    with transaction.atomic():
+        post = Post.objects.get(pk=rng.choice(post_ids))
+        Comment.objects.create(
+            post=post, author_id=rng.choice(user_ids), text='bench comment'
+        )
+
+
+def worker(path, profile, count, user_ids, post_ids, seed, barrier, results):
+    database = connections.databases['default']
+    database['NAME'] = path
+    # never touch the connection inherited from the parent process
+    del connections['default']
+    write = comment
+    if profile == 'tuned':
+        write = retry_on_busy(comment)
+    else:
+        # what a stock Django project would run with
+        settings.SQLITE_PRAGMAS = {}
+        database['OPTIONS'] = {}
+    rng = random.Random(seed)
+    done = errors = 0
+    failure = None
+    barrier.wait()
+    start = time.perf_counter()
+    try:
+        for _ in range(count):
+            try:
+                write(rng, user_ids, post_ids)
+                done += 1
+            except OperationalError as error:
+                if not is_busy(error):
+                    raise
+                errors += 1
+    except Exception as error:
+        failure = repr(error)
+    finally:
+        connections.close_all()
+        results.put((done, errors, time.perf_counter() - start, failure))
+
+
+class Command(BaseCommand):
+    help = 'Measure write throughput of concurrent processes on SQLite'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Concurrent processes, like gunicorn workers',
+        )
+        parser.add_argument(
+            '--transactions', type=int, default=200,
+            help='Write transactions per worker',
+        )
+        parser.add_argument(
+            '--profile', choices=PROFILES + ('both',), default='both',
+            help='Stock settings, the tuned ones, or both for a comparison',
+        )
+        parser.add_argument(
+            '--output', help='Write the JSON result to this file',
+        )
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'sqlite':
+            raise CommandError('The write benchmark is SQLite only')
+        user_ids = list(User.objects.values_list('pk', flat=True)[:1000])
+        post_ids = list(Post.objects.values_list('pk', flat=True)[:1000])
+        if not user_ids or not post_ids:
+            raise CommandError('No users or posts, seed the database first')
+        profiles = (
+            PROFILES if options['profile'] == 'both' else (options['profile'],)
+        )
+        result = {
+            'workers': options['workers'],
+            'transactions': options['transactions'],
+        }
+        for profile in profiles:
+            stats = result[profile] = self.run(
+                profile, options['workers'], options['transactions'],
+                user_ids, post_ids,
+            )
+            self.stdout.write(
+                f"{profile:<8} {stats['committed']:>7} committed "
+                f"{stats['locked']:>5} locked "
+                f"{stats['throughput_tps']:>9.1f} transactions/s"
+            )
+        output = json.dumps(result, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+    def run(self, profile, workers, count, user_ids, post_ids):
+        """Run ``workers`` processes against a copy of the database."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.sqlite3')
+            source = connections['default']
+            source.ensure_connection()
+            target = sqlite3.connect(path)
+            source.connection.backup(target)
+            journal = 'wal' if profile == 'tuned' else 'delete'
+            target.execute(f'PRAGMA journal_mode = {journal}')
+            target.close()
+            # forked workers must not share the parent's connection
+            connections.close_all()
+
+            context = multiprocessing.get_context('fork')
+            barrier = context.Barrier(workers)
+            results = context.Queue()
+            processes = [
+                context.Process(target=worker, args=(
+                    path, profile, count, user_ids, post_ids, seed,
+                    barrier, results,
+                ))
+                for seed in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            reports = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+
+        failures = [failure for *_, failure in reports if failure]
+        if failures:
+            raise CommandError(f'{profile} workers failed: {failures[0]}')
+        committed = sum(done for done, *_ in reports)
+        duration = max(elapsed for _, _, elapsed, _ in reports)
+        return {
+            'committed': committed,
+            'locked': sum(errors for _, errors, *_ in reports),
+            'duration_s': round(duration, 3),
+            'throughput_tps': round(committed / duration, 1)
+            if duration else 0.0,
+        }
@@ -0,0 +1,89 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from core import loadtest, query_budget
+from posts import feed_cache
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Replay a traffic mix over the posts and api routes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument(
+            '--username',
+            help='Acting user, defaults to the one following most authors',
+        )
+        parser.add_argument('--password', default='loadtest')
+        parser.add_argument(
+            '--read-only', action='store_true',
+            help='Skip scenarios that write to the database',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--throttle', action='store_true',
+            help='Keep request throttling on, all load comes from one client',
+        )
+        parser.add_argument(
+            '--output', help='Write the JSON result to this file',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['username']:
+            actor = users.filter(username=options['username']).first()
+        else:
+            actor = users.filter(stats__posts_count__gt=0).order_by(
+                '-stats__following_count'
+            ).first()
+        if actor is None:
+            raise CommandError('No acting user, seed the database first')
+        fixtures = loadtest.Fixtures(
+            actor, options['password'], seed=options['seed']
+        )
+        if fixtures.missing():
+            raise CommandError(
+                'Not enough data to load test: no '
+                + ', '.join(fixtures.missing())
+            )
+
+        feed_cache.reset_stats()
+        query_budget.reset()
+        driver = loadtest.LoadDriver(fixtures, read_only=options['read_only'])
+        with override_settings(
+            THROTTLE_ENABLED=options['throttle'] and settings.THROTTLE_ENABLED
+        ):
+            result = driver.run(options['requests'], options['concurrency'])
+        result['options'] = {
+            name: options[name]
+            for name in (
+                'requests', 'concurrency', 'read_only', 'seed', 'throttle'
+            )
+        }
+        result['actor'] = actor.username
+        result['feed_cache'] = feed_cache.stats()
+        result['queries'] = query_budget.snapshot()
+
+        for name, stats in result['endpoints'].items():
+            self.stdout.write(
+                f"{name:<32} {stats['requests']:>6} req "
+                f"p50 {stats['p50_ms']:>8.2f}ms "
+                f"p95 {stats['p95_ms']:>8.2f}ms "
+                f"p99 {stats['p99_ms']:>8.2f}ms "
+                f"{stats['errors']:>4} errors"
+            )
+        output = json.dumps(result, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['requests']} requests, "
+            f"{result['throughput_rps']} requests/s"
+        ))
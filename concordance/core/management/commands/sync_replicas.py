@@ -0,0 +1,51 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = 'Copy the default SQLite database onto its replicas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep syncing every this many seconds, once if 0',
+        )
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Replica sync is SQLite only')
+        if not settings.REPLICA_DATABASES:
+            raise CommandError('No replicas, set SQLITE_REPLICAS')
+        while True:
+            for alias in settings.REPLICA_DATABASES:
+                self.sync(source, alias)
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def sync(self, source, alias):
+        """Copy a consistent snapshot page by page with the backup API.
+
+        Replica connections stay open: SQLite locking makes them see
+        either the old or the new copy, never a half written one.
+        """
+        start = time.perf_counter()
+        source.ensure_connection()
+        target = sqlite3.connect(
+            connections[alias].settings_dict['NAME'],
+            timeout=connections[alias].settings_dict['OPTIONS'].get(
+                'timeout', 5
+            ),
+        )
+        try:
+            source.connection.backup(target)
+        finally:
+            target.close()
+        self.stdout.write(
+            f'{alias}: {time.perf_counter() - start:.2f}s'
+        )
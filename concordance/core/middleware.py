@@ -0,0 +1,62 @@
+from django.conf import settings
+
+from . import query_budget, routers
+
+
+class QueryBudgetMiddleware:
+    """Record the SQL issued by each view when ``QUERY_BUDGET`` is on.
+
+    Stats are aggregated per URL name, attached to the response as
+    ``query_stats`` and exposed in ``X-Query-*`` headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_BUDGET:
+            return self.get_response(request)
+        with query_budget.QueryRecorder() as recorder:
+            response = self.get_response(request)
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        query_budget.record(view_name, recorder)
+        recorder.view_name = view_name
+        response.query_stats = recorder
+        response['X-Query-View'] = view_name or ''
+        response['X-Query-Count'] = recorder.count
+        response['X-Query-Time'] = f'{recorder.duration * 1000:.2f}ms'
+        response['X-Query-Duplicates'] = recorder.duplicate_count
+        return response
+
+
+class ReplicaMiddleware:
+    """Route the reads of eligible views to replicas, see ``core.routers``.
+
+    A request that writes sets a short-lived cookie that keeps its
+    client's next requests on the primary.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+        routers.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.end_request()
+        if wrote:
+            response.set_cookie(
+                routers.PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (request.method in routers.SAFE_METHODS
+                and routers.PIN_COOKIE not in request.COOKIES
+                and view_func.__module__ in settings.REPLICA_VIEW_MODULES):
+            routers.read_from_replicas()
@@ -1,7 +1,26 @@
-from django.db import models
+from contextlib import contextmanager
 
+from django.db import models, router, transaction
 
-class CreatedModel(models.Model):
+
+class AtomicSaveModel(models.Model):
+    """Run the write and its post_save receivers in one transaction."""
+
+    def save_base(self, raw=False, force_insert=False,
+                  force_update=False, using=None, update_fields=None):
+        using = using or router.db_for_write(self.__class__, instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save_base(
+                raw=raw, force_insert=force_insert,
+                force_update=force_update, using=using,
+                update_fields=update_fields,
+            )
+
+    class Meta:
+        abstract = True
+
+
+class CreatedModel(AtomicSaveModel):
     pub_date = models.DateTimeField(
         'Object creation date',
         auto_now_add=True,
@@ -10,3 +29,16 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+@contextmanager
+def explicit_pub_date(*models):
+    """Let bulk loaders write ``pub_date`` instead of ``auto_now_add``."""
+    fields = [model._meta.get_field('pub_date') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
@@ -0,0 +1,79 @@
+"""Per-view SQL accounting.
+
+``QueryRecorder`` hooks every database connection through
+``execute_wrapper`` and counts queries, their total time and the
+statements repeated within one request: a fingerprint is the SQL with
+its parameters left out, so an N+1 loop shows up as one fingerprint
+executed N times. Finished requests are aggregated per URL name.
+"""
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.db import connections
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[sql] += 1
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    @property
+    def duplicates(self):
+        """Fingerprints executed more than once, most repeated first."""
+        return [
+            (sql, times) for sql, times in self.fingerprints.most_common()
+            if times > 1
+        ]
+
+    @property
+    def duplicate_count(self):
+        return sum(times - 1 for _, times in self.duplicates)
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def record(view_name, recorder):
+    with _registry_lock:
+        stats = _registry.setdefault(view_name, {
+            'requests': 0, 'queries': 0, 'max_queries': 0,
+            'duration': 0.0, 'duplicates': 0,
+        })
+        stats['requests'] += 1
+        stats['queries'] += recorder.count
+        stats['max_queries'] = max(stats['max_queries'], recorder.count)
+        stats['duration'] += recorder.duration
+        stats['duplicates'] += recorder.duplicate_count
+
+
+def snapshot():
+    """Aggregated stats of every recorded URL name."""
+    with _registry_lock:
+        return {name: dict(stats) for name, stats in _registry.items()}
+
+
+def reset():
+    with _registry_lock:
+        _registry.clear()
@@ -0,0 +1,92 @@
+"""Read replica routing with read-your-writes stickiness.
+
+Reads go to one of ``REPLICA_DATABASES`` only while a request marked by
+``ReplicaMiddleware`` is running: a safe request to a view of
+``REPLICA_VIEW_MODULES`` from a client that is not pinned. Every write
+goes to ``default``; so do reads that follow a write, run inside a
+transaction or inside ``primary()``, and sessions, which change on
+login. A request that wrote models of the project's apps pins its
+client to ``default`` for ``REPLICA_PIN_SECONDS``, which should cover
+the replication lag.
+"""
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+PIN_COOKIE = 'pin_primary'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# models that are read right after being written by another view
+PRIMARY_APPS = {'sessions'}
+
+# apps whose writes pin the client: the project's own and auth, which
+# holds its users; session and message writes change nothing a replica
+# serves
+PINNING_APPS = {'auth', 'posts', 'users', 'core', 'api', 'about'}
+
+_state = threading.local()
+
+
+def start_request():
+    _state.replica_reads = False
+    _state.wrote = False
+
+
+def read_from_replicas():
+    _state.replica_reads = True
+
+
+@contextmanager
+def primary():
+    """Read from ``default`` inside the block.
+
+    For reads whose results are cached: an entry built from a lagging
+    replica would be served to every client, pinned ones included,
+    until the next version bump.
+    """
+    replica_reads = getattr(_state, 'replica_reads', False)
+    _state.replica_reads = False
+    try:
+        yield
+    finally:
+        _state.replica_reads = replica_reads
+
+
+def end_request():
+    """Stop routing reads to replicas, return whether anything was written."""
+    wrote = getattr(_state, 'wrote', False)
+    start_request()
+    return wrote
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if (not getattr(_state, 'replica_reads', False)
+                or getattr(_state, 'wrote', False)
+                or not settings.REPLICA_DATABASES
+                or model._meta.app_label in PRIMARY_APPS
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            # follow relations on the database the instance came from
+            return instance._state.db
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in PINNING_APPS:
+            _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.REPLICA_DATABASES
@@ -0,0 +1,9 @@
+// "load more" links under a post swap themselves for the next comments
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('.comments-more');
+  if (!link) return;
+  event.preventDefault();
+  fetch(link.dataset.fragment, {credentials: 'same-origin'})
+    .then(function (response) { return response.text(); })
+    .then(function (html) { link.outerHTML = html; });
+});
@@ -0,0 +1,70 @@
+"""Static files storage writing precompressed copies for nginx."""
+import gzip
+import io
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def gzip_compress(data):
+    buffer = io.BytesIO()
+    # a fixed mtime keeps the output identical between collectstatic runs
+    with gzip.GzipFile(
+        fileobj=buffer, mode='wb', compresslevel=9, mtime=0
+    ) as file:
+        file.write(data)
+    return buffer.getvalue()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Content-hashed names, with ``.gz`` and ``.br`` siblings.
+
+    Text assets are compressed at collectstatic time, so nginx serves
+    them with ``gzip_static`` instead of compressing every response; the
+    Brotli copies are only written when the ``brotli`` package is
+    installed. Names missing from the manifest (collectstatic has not run,
+    or the asset was put in ``STATIC_ROOT`` by hand) keep their plain URL
+    rather than breaking the page.
+    """
+
+    compressible = (
+        '.css', '.js', '.map', '.json', '.svg', '.txt', '.html', '.xml',
+        '.ico', '.eot', '.ttf', '.otf',
+    )
+    # compressed copies that do not save at least this much are not kept
+    min_ratio = 0.95
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.lower().endswith(self.compressible) and self.exists(name):
+                self.compress(name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            data = file.read()
+        encoders = [('.gz', gzip_compress)]
+        if brotli is not None:
+            encoders.append(('.br', brotli.compress))
+        for suffix, encode in encoders:
+            compressed = encode(data)
+            if len(compressed) < len(data) * self.min_ratio:
+                with open(path + suffix, 'wb') as file:
+                    file.write(compressed)
+            elif os.path.exists(path + suffix):
+                os.remove(path + suffix)
@@ -0,0 +1,31 @@
+from django.test import override_settings
+
+
+class QueryBudgetMixin:
+    """Fail tests whose views issue more queries than budgeted.
+
+    ``QUERY_BUDGETS`` maps URL names to the most queries a single
+    request to that view may issue.
+    """
+
+    QUERY_BUDGETS = {}
+
+    def setUp(self):
+        super().setUp()
+        budget = override_settings(QUERY_BUDGET=True)
+        budget.enable()
+        self.addCleanup(budget.disable)
+
+    def assertWithinBudget(self, response, budget=None):
+        stats = response.query_stats
+        if budget is None:
+            budget = self.QUERY_BUDGETS[stats.view_name]
+        if stats.count > budget:
+            repeated = '\n'.join(
+                f'  {times}x {sql}' for sql, times in stats.duplicates
+            )
+            self.fail(
+                f'{stats.view_name} issued {stats.count} queries, '
+                f'budget is {budget}'
+                + (f'\nrepeated queries:\n{repeated}' if repeated else '')
+            )
@@ -0,0 +1,122 @@
+"""Request throttling on atomic cache counters.
+
+DRF's ``SimpleRateThrottle`` keeps a list of request timestamps per client
+and rewrites it on every request, which loses updates under concurrent
+workers. The throttles here only ``add()`` and ``incr()`` integer counters,
+one per client and rate period, and weigh the previous period's counter by
+how much of it still overlaps the sliding window. A client gets
+``num_requests`` per ``duration`` that refill continuously, like a token
+bucket of that size, and a refused request uses up nothing.
+"""
+import math
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class CounterThrottleMixin:
+    """Counter based ``allow_request`` and ``wait`` of a rate throttle."""
+
+    retry_after = None
+
+    @property
+    def cache(self):
+        # the counters only hold across workers in a shared cache
+        return caches['throttle']
+
+    def get_rate(self):
+        # read on every instantiation so overridden settings apply
+        scope = getattr(self, 'scope', None)
+        try:
+            return settings.THROTTLE_RATES[scope]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f'No throttle rate set for scope {scope!r}'
+            )
+
+    def allow_request(self, request, view):
+        if self.rate is None or not settings.THROTTLE_ENABLED:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        window, elapsed = divmod(self.timer(), self.duration)
+        current = f'{key}:{int(window)}'
+        count = self.increment(current)
+        previous = self.cache.get(f'{key}:{int(window) - 1}', 0)
+        remaining = self.duration - elapsed
+        if previous * remaining / self.duration + count <= self.num_requests:
+            return True
+        try:
+            self.cache.decr(current)
+        except ValueError:
+            pass
+        self.retry_after = self.time_to_free(previous, count - 1, remaining)
+        return False
+
+    def increment(self, key):
+        # the previous window's counter has to outlive its own window
+        timeout = 2 * self.duration
+        if self.cache.add(key, 1, timeout=timeout):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # expired between add() and incr()
+            self.cache.add(key, 1, timeout=timeout)
+            return 1
+
+    def time_to_free(self, previous, used, remaining):
+        """Seconds until one more request fits into the window."""
+        if used < self.num_requests:
+            # the previous window's share drains linearly until it ends
+            free = self.num_requests - 1 - used
+            return max(remaining - free * self.duration / previous, 0)
+        # once this window becomes the previous one, its share drains
+        return remaining + self.duration * max(
+            0, 1 - (self.num_requests - 1) / used
+        )
+
+    def wait(self):
+        if self.retry_after is None:
+            return None
+        return max(math.ceil(self.retry_after), 1)
+
+
+class ViewThrottle(CounterThrottleMixin, SimpleRateThrottle):
+    """A throttle of plain Django views, per user or per client address."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        super().__init__()
+
+    def get_cache_key(self, request, view):
+        if request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+def throttle(scope):
+    """Answer 429 with ``Retry-After`` once the ``scope`` rate is used up."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            limit = ViewThrottle(scope)
+            if limit.allow_request(request, view):
+                return view(request, *args, **kwargs)
+            wait = limit.wait()
+            response = HttpResponse(
+                f'Too many requests, retry in {wait} seconds.',
+                content_type='text/plain; charset=utf-8',
+                status=429,
+            )
+            response['Retry-After'] = str(wait)
+            return response
+        return wrapper
+    return decorator
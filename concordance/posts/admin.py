@@ -1,15 +1,23 @@
 from django.contrib import admin
 
 from .models import Post, Group
+from .search import search_posts
 
 
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_display = (
+        'pk', 'text', 'pub_date', 'author', 'group', 'comments_count'
+    )
     search_fields = ('text',)
     list_filter = ('pub_date',)
     list_editable = ('group',)
     empty_value_display = '-empty-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_posts(search_term, queryset), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'title', 'description')
@@ -0,0 +1,71 @@
+"""Bulk inserts that keep derived data in step.
+
+``bulk_create`` skips ``save()`` and the model signals, so these helpers
+apply what the receivers in ``signals`` would have done, once per batch
+instead of once per row: counters, timeline fan-out, thumbnails and
+feed invalidation. The full-text index is kept by database triggers.
+"""
+from collections import Counter
+
+from django.db import connections, router, transaction
+
+from . import counters, feed_cache, thumbnails, timeline
+from .models import Comment, Post
+
+
+def insert(model, objs):
+    """``bulk_create`` that leaves every object with its primary key."""
+    using = router.db_for_write(model)
+    with transaction.atomic(using=using):
+        model.objects.using(using).bulk_create(objs)
+        if (connections[using].features.can_return_ids_from_bulk_insert
+                or all(obj.pk is not None for obj in objs)):
+            return objs
+        # the transaction holds the write lock from the insert on, so
+        # the newest rows are the ones just inserted
+        pks = model.objects.using(using).order_by('-pk').values_list(
+            'pk', flat=True
+        )[:len(objs)]
+        for obj, pk in zip(objs, sorted(pks)):
+            obj.pk = pk
+    return objs
+
+
+def create_posts(posts):
+    with transaction.atomic():
+        posts = insert(Post, posts)
+        for author_id, created in Counter(
+                post.author_id for post in posts).items():
+            counters.change_user(author_id, posts_count=created)
+        timeline.fan_out(*posts)
+        feed_cache.invalidate(*{
+            scope for post in posts for scope in feed_cache.post_scopes(post)
+        })
+        for post in posts:
+            if post.image:
+                thumbnails.queue(post)
+    return posts
+
+
+def create_comments(comments):
+    with transaction.atomic():
+        comments = insert(Comment, comments)
+        for post_id, created in Counter(
+                comment.post_id for comment in comments).items():
+            counters.change_post(post_id, comments_count=created)
+        feed_cache.invalidate(*{
+            scope for comment in comments
+            for scope in feed_cache.comment_scopes(comment.post_id)
+        })
+    return comments
+
+
+CREATORS = {
+    Post: create_posts,
+    Comment: create_comments,
+}
+
+
+def create(model, objs):
+    """Insert ``objs`` of ``model`` in one transaction."""
+    return CREATORS[model](list(objs))
@@ -0,0 +1,64 @@
+"""Rendered post cards shared by every feed page.
+
+A card is the HTML of one post in one feed layout. It is cached under
+the versions of the post, its author and its group, which post edits,
+author renames and group edits bump, so a feed page only renders the
+posts that changed and assembles the rest from the cache.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.template import Context, Engine
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from . import feed_cache
+
+
+CARD_KEY = 'post-card:{variant}:{language}:{post}:{versions}'
+CARD_TEMPLATE = 'posts/includes/cards/{}.html'
+
+
+def card_scopes(post):
+    scopes = [f'card:post:{post.pk}', f'card:user:{post.author_id}']
+    if post.group_id is not None:
+        scopes.append(f'card:group:{post.group_id}')
+    return scopes
+
+
+def render_cards(posts, variant, engine=None):
+    """HTML cards of ``posts``, rendering only those not cached yet.
+
+    Versions and cards are each read with one ``get_many``. Cards are
+    rendered by ``engine``, the one rendering the page, if given. Cards
+    of posts read from a replica are not cached, they may be stale.
+    """
+    posts = list(posts)
+    scopes = [card_scopes(post) for post in posts]
+    unique = sorted({scope for post_scopes in scopes for scope in post_scopes})
+    versions = dict(zip(unique, feed_cache.get_versions(*unique)))
+    language = get_language()
+    keys = [
+        CARD_KEY.format(
+            variant=variant, language=language, post=post.pk,
+            versions='-'.join(str(versions[scope]) for scope in post_scopes),
+        )
+        for post, post_scopes in zip(posts, scopes)
+    ]
+    cached = cache.get_many(keys)
+    engine = engine or Engine.get_default()
+    template = engine.get_template(CARD_TEMPLATE.format(variant))
+    rendered = {}
+    cards = []
+    for post, key in zip(posts, keys):
+        card = cached.get(key)
+        if card is None:
+            card = template.render(
+                Context({'post': post}, autoescape=engine.autoescape)
+            )
+            if post._state.db == DEFAULT_DB_ALIAS:
+                rendered[key] = card
+        cards.append(mark_safe(card))
+    if rendered:
+        cache.set_many(rendered, timeout=settings.POST_CARD_CACHE_TIMEOUT)
+    return cards
@@ -0,0 +1,97 @@
+"""Conditional GET answered from feed scope versions.
+
+A response is fingerprinted by the versions of the scopes it depends
+on, the same versions that key the feed cache. Validating a request
+costs one cache round trip, so an unchanged resource is answered with
+304 before the view queries the database or renders anything.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date
+
+from core import routers
+
+from . import feed_cache
+
+
+def validators(scopes, *extra):
+    """ETag and Last-Modified timestamp of a response built from ``scopes``.
+
+    ``extra`` holds whatever else the representation depends on, like
+    the viewer or the renderer.
+    """
+    versions = feed_cache.get_versions(*scopes)
+    fingerprint = '|'.join(
+        [*map(str, extra), *scopes, *map(str, versions)]
+    )
+    etag = '"{}"'.format(hashlib.md5(fingerprint.encode()).hexdigest())
+    # versions are microsecond timestamps
+    return etag, max(versions) // 10 ** 6
+
+
+def respond(request, scopes, build, *extra, last_modified=True):
+    """Return 304 if the client is current, otherwise ``build()``.
+
+    Validators are attached to successful responses only. A body read
+    from a replica that lags behind the newest version would stay valid
+    under the current ETag until the next bump, so while a scope changed
+    more recently than ``REPLICA_PIN_SECONDS`` ago the response is built
+    from the primary; otherwise it reads wherever the request reads.
+    """
+    etag, changed = validators(scopes, *extra)
+    modified = changed if last_modified else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=modified
+    )
+    if response is None:
+        if time.time() - changed < settings.REPLICA_PIN_SECONDS:
+            with routers.primary():
+                response = build()
+        else:
+            response = build()
+        if response.status_code != 200:
+            return response
+    response['ETag'] = etag
+    if modified is not None:
+        response['Last-Modified'] = http_date(modified)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_page(scopes):
+    """Answer conditional GETs of an HTML view.
+
+    ``scopes(request, *args, **kwargs)`` lists the scopes the page
+    depends on, or returns None when the view should run regardless.
+    Pages render the viewer in the header, so the validators are per
+    viewer and Last-Modified is only sent to anonymous ones.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or len(
+                    get_messages(request)):
+                return view(request, *args, **kwargs)
+            # scopes() may load what the view renders, see profile_scopes
+            with routers.primary():
+                page_scopes = scopes(request, *args, **kwargs)
+            if page_scopes is None:
+                return view(request, *args, **kwargs)
+            anonymous = not request.user.is_authenticated
+            response = respond(
+                request, page_scopes,
+                lambda: view(request, *args, **kwargs),
+                request.user.pk, last_modified=anonymous,
+            )
+            patch_cache_control(response, private=True)
+            patch_vary_headers(response, ['Cookie'])
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,78 @@
+"""Denormalized counters kept next to the rows they describe.
+
+Writers adjust the counters with ``F()`` expressions so concurrent
+requests never lose an update; ``reconcile`` recomputes them from the
+source tables to repair any drift (bulk inserts, raw SQL, crashes).
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Follow, Post, User, UserStats
+
+
+def _increment(queryset, **deltas):
+    # clamp at zero: rows inserted without signals start undercounted
+    return queryset.update(**{
+        field: Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+    })
+
+
+def change_user(user_id, **deltas):
+    stats = UserStats.objects.filter(user_id=user_id)
+    if not _increment(stats, **deltas) and max(deltas.values()) > 0:
+        UserStats.objects.get_or_create(user_id=user_id)
+        _increment(stats, **deltas)
+
+
+def change_post(post_id, **deltas):
+    _increment(Post.objects.filter(pk=post_id), **deltas)
+
+
+def count_of(model, field):
+    """Correlated ``COUNT(*)`` of ``model`` rows pointing at the outer pk."""
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0
+    )
+
+
+def _reconcile(queryset, **actual):
+    drift = queryset.annotate(
+        **{f'actual_{field}': value for field, value in actual.items()}
+    )
+    fixed = 0
+    for field in actual:
+        drifted = drift.exclude(**{field: F(f'actual_{field}')})
+        fixed += queryset.filter(pk__in=drifted.values('pk')).update(
+            **{field: actual[field]}
+        )
+    return fixed
+
+
+def reconcile():
+    """Recompute every counter, returns the number of rows corrected."""
+    with transaction.atomic():
+        missing = User.objects.filter(stats__isnull=True)
+        UserStats.objects.bulk_create(
+            UserStats(user_id=pk)
+            for pk in missing.values_list('pk', flat=True).iterator()
+        )
+        fixed = _reconcile(
+            Post.objects.order_by(),
+            comments_count=count_of(Comment, 'post'),
+        )
+        fixed += _reconcile(
+            UserStats.objects.all(),
+            posts_count=count_of(Post, 'author'),
+            followers_count=count_of(Follow, 'author'),
+            following_count=count_of(Follow, 'user'),
+        )
+    return fixed
@@ -0,0 +1,76 @@
+"""Newline-delimited JSON dumps of the community data.
+
+Rows are read with ``values_list().iterator()``, so no model instances
+are built and memory stays flat however large the tables are. Authors
+and groups are written as usernames and slugs, which keeps dumps
+loadable into another database by ``import_data``.
+"""
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Comment, Follow, Group, Post
+
+
+CHUNK_SIZE = 2000
+
+# record type: (model, exported fields, whether it has pub_date)
+TYPES = {
+    'group': (Group, ('id', 'title', 'slug', 'description'), False),
+    'post': (
+        Post,
+        ('id', 'author__username', 'group__slug', 'text', 'image',
+         'pub_date'),
+        True,
+    ),
+    'comment': (
+        Comment, ('id', 'post_id', 'author__username', 'text', 'pub_date'),
+        True,
+    ),
+    'follow': (Follow, ('user__username', 'author__username'), False),
+}
+
+FIELD_NAMES = {
+    'author__username': 'author',
+    'group__slug': 'group',
+    'post_id': 'post',
+    'user__username': 'user',
+}
+
+
+def parse_since(value):
+    """Aware datetime from an ISO date or datetime, None if invalid."""
+    since = parse_datetime(value)
+    if since is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        since = datetime(day.year, day.month, day.day)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def records(types=TYPES, since=None, chunk_size=CHUNK_SIZE):
+    """Yield one dict per row; ``since`` filters by ``pub_date``.
+
+    Groups and follows carry no date and are always dumped whole.
+    """
+    for record_type in types:
+        model, fields, dated = TYPES[record_type]
+        rows = model.objects.order_by('pk')
+        if since is not None and dated:
+            rows = rows.filter(pub_date__gte=since)
+        names = [FIELD_NAMES.get(field, field) for field in fields]
+        for row in rows.values_list(*fields).iterator(chunk_size=chunk_size):
+            record = dict(zip(names, row))
+            record['type'] = record_type
+            yield record
+
+
+def ndjson(types=TYPES, since=None, chunk_size=CHUNK_SIZE):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for record in records(types, since, chunk_size):
+        yield encoder.encode(record) + '\n'
@@ -0,0 +1,146 @@
+"""Versioned cache of feed pages.
+
+Every feed page is stored under a key built from the versions of the
+scopes it depends on (``index``, ``group:<id>``, ``profile:<id>``...).
+Model signals bump those versions, which orphans the stale entries
+instead of waiting for a TTL to expire.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core import routers
+
+from .utils import decode_cursor, encode_cursor
+
+
+VERSION_KEY = 'feed-version:{}'
+PAGE_KEY = 'feed-page:{scopes}:{versions}:{cursor}'
+STATS_KEY = 'feed-stats:{}'
+
+
+def _new_version():
+    # a timestamp rather than a counter: if a version key gets culled, the
+    # regenerated one can not collide with a version that is still cached
+    return time.time_ns() // 1000
+
+
+def post_scopes(post, group_ids=()):
+    """Feed scopes a post appears in, and the post itself."""
+    scopes = {'index', f'post:{post.pk}', f'profile:{post.author_id}'}
+    scopes.update(
+        f'group:{group_id}'
+        for group_id in (post.group_id, *group_ids)
+        if group_id is not None
+    )
+    return scopes
+
+
+def comment_scopes(post_id):
+    """Scopes comments show up in: their post and comment counts.
+
+    No feed page renders comments, so the feeds keep their versions.
+    """
+    return {f'post:{post_id}', 'comments'}
+
+
+def get_versions(*scopes):
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def get_version(scope):
+    version, = get_versions(scope)
+    return version
+
+
+def _bump(scopes):
+    version = _new_version()
+    cache.set_many(
+        {VERSION_KEY.format(scope): version for scope in scopes},
+        timeout=None
+    )
+
+
+def invalidate(*scopes):
+    """Bump scope versions now and once more after the commit.
+
+    The second bump drops pages that a concurrent request rebuilt from
+    the database before the writing transaction became visible.
+    """
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def _count(event):
+    key = STATS_KEY.format(event)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+
+def cursor_key(cursor):
+    """The canonical token of ``cursor``, empty for the first page.
+
+    Broken tokens are served the first page and share its entry, so
+    arbitrary query strings can not fill the cache with copies of it.
+    """
+    position, backwards = decode_cursor(cursor)
+    if position is None:
+        return ''
+    return encode_cursor(position, backwards)
+
+
+def get_page(request, build, *scopes):
+    """Return the feed page for ``request``, built once per version.
+
+    Numbered ``?page=`` requests carry a live paginator and are not
+    cached; they read wherever the request reads. Cached pages are
+    served to every client, so they are built from the primary.
+    """
+    if 'page' in request.GET:
+        return build()
+    versions = '-'.join(str(version) for version in get_versions(*scopes))
+    key = PAGE_KEY.format(
+        scopes='-'.join(scopes),
+        versions=versions,
+        cursor=cursor_key(request.GET.get('cursor')),
+    )
+    page_obj = cache.get(key)
+    if page_obj is not None:
+        _count('hits')
+        return page_obj
+    _count('misses')
+    with routers.primary():
+        page_obj = build()
+    cache.set(key, page_obj, timeout=settings.FEED_CACHE_TIMEOUT)
+    return page_obj
+
+
+def stats():
+    counters = cache.get_many(
+        [STATS_KEY.format('hits'), STATS_KEY.format('misses')]
+    )
+    hits = counters.get(STATS_KEY.format('hits'), 0)
+    misses = counters.get(STATS_KEY.format('misses'), 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_stats():
+    cache.delete_many(
+        [STATS_KEY.format('hits'), STATS_KEY.format('misses')]
+    )
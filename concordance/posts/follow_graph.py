@@ -0,0 +1,101 @@
+"""Cached follow graph.
+
+Every user's set of followed author ids and every author's followers
+count are cached, so follow feeds and follow buttons are lookups in
+memory instead of queries. Writes never trust the cached sets, they
+may lag behind the database.
+
+Follow signals keep the cache current. Id sets are dropped right away
+and once more after the commit, like ``feed_cache.invalidate``, in case
+a concurrent request cached the set the writing transaction had not
+committed yet. Counts are adjusted right away and dropped after the
+commit, so the next read takes the committed ``UserStats`` value. Bulk
+writes that skip the signals clear the whole cache. Misses are read
+from the primary, a replica may not have the latest follows yet.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import Follow, UserStats
+
+
+FOLLOWING_KEY = 'follow-graph:following:{}'
+FOLLOWERS_KEY = 'follow-graph:followers:{}'
+
+
+def following(user_id):
+    """Ids of the authors ``user_id`` follows, as a frozenset."""
+    key = FOLLOWING_KEY.format(user_id)
+    author_ids = cache.get(key)
+    if author_ids is None:
+        author_ids = frozenset(
+            Follow.objects.using(DEFAULT_DB_ALIAS).filter(
+                user_id=user_id
+            ).values_list('author_id', flat=True)
+        )
+        cache.set(
+            key, author_ids, timeout=settings.FOLLOW_GRAPH_CACHE_TIMEOUT
+        )
+    return author_ids
+
+
+def is_following(user_id, author_id):
+    return user_id is not None and author_id in following(user_id)
+
+
+def followers_counts(author_ids):
+    """``{author_id: followers count}``, fetching the misses in one query."""
+    keys = {
+        FOLLOWERS_KEY.format(author_id): author_id
+        for author_id in author_ids
+    }
+    counts = {
+        keys[key]: count for key, count in cache.get_many(keys).items()
+    }
+    missing = [
+        author_id for author_id in keys.values() if author_id not in counts
+    ]
+    if missing:
+        stored = dict(
+            UserStats.objects.using(DEFAULT_DB_ALIAS).filter(
+                user_id__in=missing
+            ).values_list('user_id', 'followers_count')
+        )
+        fetched = {
+            author_id: stored.get(author_id, 0) for author_id in missing
+        }
+        cache.set_many(
+            {
+                FOLLOWERS_KEY.format(author_id): count
+                for author_id, count in fetched.items()
+            },
+            timeout=settings.FOLLOW_GRAPH_CACHE_TIMEOUT,
+        )
+        counts.update(fetched)
+    return counts
+
+
+def followers_count(author_id):
+    return followers_counts([author_id])[author_id]
+
+
+def _change_followers(author_id, delta):
+    try:
+        cache.incr(FOLLOWERS_KEY.format(author_id), delta)
+    except ValueError:
+        # not cached, the next read fetches the stored count
+        pass
+
+
+def record(user_id, author_id, followed):
+    """Account for a created (``followed``) or deleted follow."""
+    # dropped rather than rewritten: a read-modify-write of the set
+    # would lose one of two concurrent follows
+    following_key = FOLLOWING_KEY.format(user_id)
+    cache.delete(following_key)
+    _change_followers(author_id, 1 if followed else -1)
+
+    def committed():
+        cache.delete_many([following_key, FOLLOWERS_KEY.format(author_id)])
+    transaction.on_commit(committed)
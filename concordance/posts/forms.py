@@ -1,5 +1,7 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
+from .images import normalize
 from .models import Post, Comment
 
 
@@ -25,6 +27,13 @@ class PostForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         self.fields['group'].empty_label = 'Выберите группу'
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        # only new uploads, not the stored image or a cleared field
+        if isinstance(image, UploadedFile):
+            return normalize(image)
+        return image
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
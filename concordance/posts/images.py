@@ -0,0 +1,51 @@
+"""Normalization of uploaded post images.
+
+Uploads are downscaled to ``POST_IMAGE_MAX_SIZE``, turned upright and
+re-encoded without their metadata before they are stored, so neither the
+storage nor the thumbnail workers deal with full resolution camera files.
+"""
+import io
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+
+def webp_enabled():
+    """Whether WebP variants are configured and Pillow can encode them."""
+    return settings.POST_IMAGE_WEBP and features.check('webp')
+
+
+def normalize(upload):
+    """A downscaled, metadata free copy of the uploaded image ``upload``.
+
+    Opaque images become JPEG, images with transparency PNG. Animated
+    images are returned untouched, re-encoding would drop their frames.
+    """
+    upload.seek(0)
+    image = Image.open(upload)
+    if getattr(image, 'is_animated', False):
+        upload.seek(0)
+        return upload
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    ):
+        image, image_format, extension = image.convert('RGBA'), 'PNG', '.png'
+        options = {'optimize': True}
+    else:
+        image, image_format, extension = image.convert('RGB'), 'JPEG', '.jpg'
+        options = {
+            'quality': settings.POST_IMAGE_QUALITY,
+            'optimize': True,
+            'progressive': True,
+        }
+    size = settings.POST_IMAGE_MAX_SIZE
+    image.thumbnail((size, size), Image.LANCZOS)
+    # nothing from the upload's info (EXIF, ICC, comments) is written back
+    image.info = {}
+    content = io.BytesIO()
+    image.save(content, image_format, **options)
+    name = os.path.splitext(os.path.basename(upload.name))[0] + extension
+    return ContentFile(content.getvalue(), name=name)
@@ -0,0 +1,247 @@
+"""Bulk loading of exported community data.
+
+Records (see ``export``) are buffered per type and written with
+``bulk_create``, one transaction per chunk. Usernames, group slugs and
+exported post ids are resolved through in-memory maps filled a chunk at
+a time. Signals do not fire for bulk inserts, so counters, timelines,
+the search index and the feed cache are rebuilt once at the end.
+"""
+import csv
+import json
+from collections import Counter, defaultdict
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.models import explicit_pub_date
+from . import bulk, counters, search, timeline
+from .models import Comment, Follow, Group, Post, User
+
+
+# records of a type are only written after those they refer to
+DEPENDENCIES = {
+    'group': (),
+    'post': ('group',),
+    'comment': ('post',),
+    'follow': (),
+}
+
+# keeps ``IN (...)`` lookups under SQLite's variable limit
+LOOKUP_CHUNK = 500
+
+
+def read_ndjson(file):
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_csv(file, record_type=None):
+    for row in csv.DictReader(file):
+        if record_type:
+            row.setdefault('type', record_type)
+        yield row
+
+
+class Importer:
+    def __init__(self, batch_size=1000, create_users=False, keep_ids=False):
+        self.batch_size = batch_size
+        self.create_users = create_users
+        self.keep_ids = keep_ids
+        self.users = {}
+        self.groups = {}
+        self.posts = {}
+        self.buffers = defaultdict(list)
+        self.imported = Counter()
+        self.skipped = Counter()
+
+    def feed(self, records):
+        for record in records:
+            record_type = record.get('type')
+            if record_type not in DEPENDENCIES:
+                self.skipped[f'unknown type {record_type!r}'] += 1
+                continue
+            buffer = self.buffers[record_type]
+            buffer.append(record)
+            if len(buffer) >= self.batch_size:
+                self.flush(record_type)
+
+    def finish(self):
+        for record_type in DEPENDENCIES:
+            self.flush(record_type)
+
+    def flush(self, record_type):
+        for dependency in DEPENDENCIES[record_type]:
+            self.flush(dependency)
+        records = self.buffers.pop(record_type, [])
+        if records:
+            with transaction.atomic():
+                getattr(self, f'write_{record_type}s')(records)
+
+    @staticmethod
+    def _chunks(values):
+        values = list(values)
+        for start in range(0, len(values), LOOKUP_CHUNK):
+            yield values[start:start + LOOKUP_CHUNK]
+
+    def resolve_users(self, records, *fields):
+        names = {
+            record[field] for record in records for field in fields
+            if record.get(field)
+        } - set(self.users)
+        for chunk in self._chunks(names):
+            self.users.update(
+                User.objects.filter(username__in=chunk)
+                .values_list('username', 'pk')
+            )
+        missing = names - set(self.users)
+        if missing and self.create_users:
+            password = make_password(None)
+            User.objects.bulk_create(
+                User(username=name, password=password) for name in missing
+            )
+            for chunk in self._chunks(missing):
+                self.users.update(
+                    User.objects.filter(username__in=chunk)
+                    .values_list('username', 'pk')
+                )
+            self.imported['user'] += len(missing)
+
+    def resolve_groups(self, records, field='group'):
+        slugs = {
+            record[field] for record in records if record.get(field)
+        } - set(self.groups)
+        for chunk in self._chunks(slugs):
+            self.groups.update(
+                Group.objects.filter(slug__in=chunk).values_list('slug', 'pk')
+            )
+
+    def skip(self, reason):
+        self.skipped[reason] += 1
+
+    @staticmethod
+    def pub_date(record):
+        value = record.get('pub_date')
+        if not value:
+            return timezone.now()
+        pub_date = parse_datetime(value)
+        if pub_date is not None and timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return pub_date
+
+    def write_groups(self, records):
+        self.resolve_groups(records, 'slug')
+        groups = []
+        for record in records:
+            if not record.get('slug') or not record.get('title'):
+                self.skip('group without slug or title')
+            elif record['slug'] in self.groups:
+                self.skip('group already exists')
+            else:
+                groups.append(Group(
+                    title=record['title'], slug=record['slug'],
+                    description=record.get('description') or '',
+                ))
+                self.groups[record['slug']] = None
+        bulk.insert(Group, groups)
+        self.groups.update((group.slug, group.pk) for group in groups)
+        self.imported['group'] += len(groups)
+
+    def write_posts(self, records):
+        self.resolve_users(records, 'author')
+        self.resolve_groups(records)
+        posts, sources = [], []
+        for record in records:
+            author_id = self.users.get(record.get('author'))
+            pub_date = self.pub_date(record)
+            if author_id is None:
+                self.skip('unknown author')
+            elif not record.get('text'):
+                self.skip('post without text')
+            elif pub_date is None:
+                self.skip('invalid pub_date')
+            elif record.get('group') and record['group'] not in self.groups:
+                self.skip('unknown group')
+            else:
+                posts.append(Post(
+                    id=record.get('id') if self.keep_ids else None,
+                    author_id=author_id,
+                    group_id=self.groups.get(record.get('group')),
+                    text=record['text'],
+                    image=record.get('image') or '',
+                    pub_date=pub_date,
+                ))
+                sources.append(record.get('id'))
+        with explicit_pub_date(Post):
+            bulk.insert(Post, posts)
+        self.posts.update(
+            (str(source), post.pk)
+            for source, post in zip(sources, posts) if source
+        )
+        self.imported['post'] += len(posts)
+
+    def resolve_posts(self, records):
+        """Map exported post ids; kept ids may refer to existing posts."""
+        if not self.keep_ids:
+            return
+        ids = {
+            str(record['post']) for record in records if record.get('post')
+        } - set(self.posts)
+        for chunk in self._chunks(ids):
+            self.posts.update(
+                (str(pk), pk) for pk in
+                Post.objects.filter(pk__in=chunk).values_list('pk', flat=True)
+            )
+
+    def write_comments(self, records):
+        self.resolve_users(records, 'author')
+        self.resolve_posts(records)
+        comments = []
+        for record in records:
+            author_id = self.users.get(record.get('author'))
+            post_id = self.posts.get(str(record.get('post')))
+            pub_date = self.pub_date(record)
+            if author_id is None:
+                self.skip('unknown author')
+            elif post_id is None:
+                self.skip('unknown post')
+            elif not record.get('text'):
+                self.skip('comment without text')
+            elif pub_date is None:
+                self.skip('invalid pub_date')
+            else:
+                comments.append(Comment(
+                    id=record.get('id') if self.keep_ids else None,
+                    post_id=post_id, author_id=author_id,
+                    text=record['text'], pub_date=pub_date,
+                ))
+        with explicit_pub_date(Comment):
+            Comment.objects.bulk_create(comments)
+        self.imported['comment'] += len(comments)
+
+    def write_follows(self, records):
+        self.resolve_users(records, 'user', 'author')
+        follows = []
+        for record in records:
+            user_id = self.users.get(record.get('user'))
+            author_id = self.users.get(record.get('author'))
+            if user_id is None or author_id is None:
+                self.skip('unknown user')
+            elif user_id == author_id:
+                self.skip('self follow')
+            else:
+                follows.append(Follow(user_id=user_id, author_id=author_id))
+        # duplicates of existing follows are dropped by the database
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
+        self.imported['follow'] += len(follows)
+
+
+def rebuild():
+    """Recompute everything bulk inserts leave behind, in one pass."""
+    counters.reconcile()
+    timeline.rebuild()
+    search.rebuild()
+    cache.clear()
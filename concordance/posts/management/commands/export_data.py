@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = 'Dump groups, posts, comments and follows as NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--types', nargs='+', choices=list(export.TYPES),
+            default=list(export.TYPES),
+        )
+        parser.add_argument(
+            '--since', help='Only dated rows published at or after this',
+        )
+        parser.add_argument('--output', help='File to write, default stdout')
+        parser.add_argument(
+            '--chunk-size', type=int, default=export.CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = export.parse_since(options['since'])
+            if since is None:
+                raise CommandError(f"Invalid date: {options['since']}")
+        lines = export.ndjson(
+            options['types'], since, options['chunk_size']
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Render thumbnails of posts that have an image but none yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Render thumbnails of every post with an image',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(thumbnails='')
+        generated = sum(
+            thumbnails.generate(pk)
+            for pk in posts.values_list('pk', flat=True).iterator()
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Thumbnails generated for {generated} posts'
+        ))
@@ -0,0 +1,80 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import importer
+
+
+class Command(BaseCommand):
+    help = 'Load groups, posts, comments and follows from NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Input file, - for stdin')
+        parser.add_argument(
+            '--format', choices=('ndjson', 'csv'),
+            help='Input format, guessed from the file name by default',
+        )
+        parser.add_argument(
+            '--type', choices=list(importer.DEPENDENCIES),
+            help='Record type of CSV rows without a type column',
+        )
+        parser.add_argument('--batch', type=int, default=1000)
+        parser.add_argument(
+            '--create-users', action='store_true',
+            help='Create unknown authors with unusable passwords',
+        )
+        parser.add_argument(
+            '--keep-ids', action='store_true',
+            help='Insert posts and comments with their exported ids',
+        )
+        parser.add_argument(
+            '--skip-rebuild', action='store_true',
+            help='Do not rebuild counters, timelines and the search index',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        data_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson'
+        )
+        loader = importer.Importer(
+            batch_size=options['batch'],
+            create_users=options['create_users'],
+            keep_ids=options['keep_ids'],
+        )
+        file = (
+            sys.stdin if path == '-'
+            else open(path, encoding='utf-8', newline='')
+        )
+        start = time.perf_counter()
+        try:
+            if data_format == 'csv':
+                records = importer.read_csv(file, options['type'])
+            else:
+                records = importer.read_ndjson(file)
+            loader.feed(records)
+            loader.finish()
+        except ValueError as error:
+            raise CommandError(f'Invalid input: {error}')
+        finally:
+            if file is not sys.stdin:
+                file.close()
+        elapsed = time.perf_counter() - start
+
+        total = sum(loader.imported.values())
+        for record_type, count in sorted(loader.imported.items()):
+            self.stdout.write(f'{record_type}: {count} imported')
+        for reason, count in sorted(loader.skipped.items()):
+            self.stdout.write(self.style.WARNING(f'skipped {count}: {reason}'))
+        self.stdout.write(
+            f'{total} rows in {elapsed:.1f}s, '
+            f'{total / elapsed if elapsed else 0:.0f} rows/s'
+        )
+        if not options['skip_rebuild']:
+            start = time.perf_counter()
+            importer.rebuild()
+            self.stdout.write(
+                f'derived data rebuilt in {time.perf_counter() - start:.1f}s'
+            )
+        self.stdout.write(self.style.SUCCESS('Import finished'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute post, comment and follower counters from source tables'
+
+    def handle(self, *args, **options):
+        fixed = counters.reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f'Counters reconciled, {fixed} rows corrected'
+        ))
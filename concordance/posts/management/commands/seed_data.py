@@ -0,0 +1,230 @@
+import io
+import json
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.text import slugify
+from faker import Faker
+from PIL import Image
+
+from core.models import explicit_pub_date
+from posts import counters, search, thumbnails, timeline
+from posts.models import Comment, Follow, Group, Post, User
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a synthetic dataset for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=200000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument(
+            '--follows', type=float, default=20,
+            help='Mean number of authors followed per user',
+        )
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Zipf exponent of author popularity',
+        )
+        parser.add_argument(
+            '--images', type=int, default=20,
+            help='Distinct images shared by the posts that have one',
+        )
+        parser.add_argument(
+            '--image-ratio', type=float, default=0.2,
+            help='Share of posts with an image',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Spread publication dates over this many days',
+        )
+        parser.add_argument('--password', default='loadtest')
+        parser.add_argument('--batch', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--skip-timelines', action='store_true',
+            help='Do not materialize follow timelines',
+        )
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options['seed'])
+        self.fake = Faker()
+        self.fake.seed_instance(options['seed'])
+        self.now = timezone.now()
+        self.sentences = [self.fake.sentence() for _ in range(2000)]
+
+        group_ids = self.stage('groups', self.create_groups)
+        user_ids = self.stage('users', self.create_users)
+        # a shuffled Zipf distribution: few authors get most of the
+        # followers, posts and comments
+        popular = user_ids[:]
+        self.random.shuffle(popular)
+        self.popular = popular
+        self.popularity = list(accumulate(
+            1 / rank ** options['skew'] for rank in range(1, len(popular) + 1)
+        ))
+        self.stage('follows', self.create_follows, user_ids)
+        images = self.stage('images', self.create_images)
+        post_ids = self.stage('posts', self.create_posts, group_ids, images)
+        self.stage('comments', self.create_comments, user_ids, post_ids)
+        self.stage('counters', counters.reconcile)
+        if not options['skip_timelines']:
+            self.stage('timelines', timeline.rebuild)
+        self.stage('search index', search.rebuild)
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS('Dataset seeded'))
+
+    def stage(self, name, function, *args):
+        start = time.perf_counter()
+        result = function(*args)
+        self.stdout.write(
+            f'{name}: {time.perf_counter() - start:.1f}s'
+        )
+        return result
+
+    def pick_authors(self, count):
+        return self.random.choices(
+            self.popular, cum_weights=self.popularity, k=count
+        )
+
+    def random_date(self):
+        return self.now - timedelta(
+            seconds=self.random.uniform(0, self.options['days'] * 86400)
+        )
+
+    def text(self, sentences):
+        return ' '.join(self.random.choices(self.sentences, k=sentences))
+
+    def insert(self, model, objects, **kwargs):
+        for batch in batched(objects, self.options['batch']):
+            model.objects.bulk_create(batch, **kwargs)
+
+    def new_ids(self, model, before):
+        return list(
+            model.objects.filter(pk__gt=before).order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+    def last_id(self, model):
+        last = model.objects.order_by('-pk').values_list('pk', flat=True)
+        return last.first() or 0
+
+    def create_groups(self):
+        before = self.last_id(Group)
+        self.insert(Group, (
+            Group(
+                title=title,
+                slug=f'{slugify(title)[:20]}-{before + number}',
+                description=self.text(3),
+            )
+            for number, title in enumerate(
+                self.fake.unique.catch_phrase()
+                for _ in range(self.options['groups'])
+            )
+        ))
+        return self.new_ids(Group, before)
+
+    def create_users(self):
+        before = self.last_id(User)
+        password = make_password(self.options['password'])
+        self.insert(User, (
+            User(
+                username=f'{self.fake.user_name()}{before + number}',
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                email=self.fake.email(),
+                password=password,
+            )
+            for number in range(self.options['users'])
+        ))
+        return self.new_ids(User, before)
+
+    def create_follows(self, user_ids):
+        mean = self.options['follows']
+
+        def follows():
+            for user_id in user_ids:
+                count = min(
+                    int(self.random.expovariate(1 / mean)) if mean else 0,
+                    len(user_ids) - 1,
+                )
+                for author_id in set(self.pick_authors(count)):
+                    if author_id != user_id:
+                        yield Follow(user_id=user_id, author_id=author_id)
+
+        self.insert(Follow, follows(), ignore_conflicts=True)
+
+    def create_images(self):
+        images = []
+        for number in range(self.options['images']):
+            image = Image.new('RGB', (800, 600), tuple(
+                self.random.randrange(256) for _ in range(3)
+            ))
+            content = io.BytesIO()
+            image.save(content, format='jpeg')
+            name = default_storage.save(
+                f'posts/seed_{number}.jpg', ContentFile(content.getvalue())
+            )
+            images.append((name, json.dumps(thumbnails.render(name))))
+        return images
+
+    def create_posts(self, group_ids, images):
+        before = self.last_id(Post)
+        ratio = self.options['image_ratio'] if images else 0
+
+        def posts():
+            for author_id in self.pick_authors(self.options['posts']):
+                image, rendered = (
+                    self.random.choice(images)
+                    if self.random.random() < ratio else ('', '')
+                )
+                yield Post(
+                    text=self.text(self.random.randint(1, 6)),
+                    author_id=author_id,
+                    group_id=(
+                        self.random.choice(group_ids)
+                        if group_ids and self.random.random() < 0.5 else None
+                    ),
+                    image=image,
+                    thumbnails=rendered,
+                    pub_date=self.random_date(),
+                )
+
+        with explicit_pub_date(Post):
+            self.insert(Post, posts())
+        return self.new_ids(Post, before)
+
+    def create_comments(self, user_ids, post_ids):
+        if not post_ids:
+            return
+        comments = (
+            Comment(
+                post_id=self.random.choice(post_ids),
+                author_id=self.random.choice(user_ids),
+                text=self.text(self.random.randint(1, 2)),
+                pub_date=self.random_date(),
+            )
+            for _ in range(self.options['comments'])
+        )
+        with explicit_pub_date(Comment):
+            self.insert(Comment, comments)
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-17 05:55
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ['-pub_date', '-id']},
+        ),
+    ]
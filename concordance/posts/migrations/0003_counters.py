@@ -0,0 +1,64 @@
+# Generated by Django 2.2.16 on 2026-10-17 05:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def populate_counters(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    UserStats = apps.get_model('posts', 'UserStats')
+
+    def totals(model, field):
+        return dict(
+            model.objects.order_by().values_list(field)
+            .annotate(total=Count('pk'))
+        )
+
+    posts = totals(Post, 'author')
+    followers = totals(Follow, 'author')
+    following = totals(Follow, 'user')
+    UserStats.objects.bulk_create(
+        UserStats(
+            user_id=pk,
+            posts_count=posts.get(pk, 0),
+            followers_count=followers.get(pk, 0),
+            following_count=following.get(pk, 0),
+        )
+        for pk in User.objects.values_list('pk', flat=True)
+    )
+    for pk, total in totals(Comment, 'post').items():
+        Post.objects.filter(pk=pk).update(comments_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0002_post_ordering_tiebreak'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Posts count')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Followers count')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Following count')),
+            ],
+            options={
+                'verbose_name_plural': 'User stats',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Comments count'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 2.2.16 on 2026-10-17 05:59
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# TIMELINE_BACKFILL as of this migration, frozen so changing the setting
+# later does not change what migrating a database does
+BACKFILL = 500
+
+
+def backfill_timelines(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    for user_id, author_id in Follow.objects.values_list('user', 'author'):
+        posts = Post.objects.filter(author_id=author_id).order_by(
+            '-pub_date', '-id'
+        )[:BACKFILL]
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(
+                user_id=user_id, post_id=pk,
+                author_id=author_id, pub_date=pub_date,
+            )
+            for pk, pub_date in posts.values_list('pk', 'pub_date')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0003_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeline_entries', to='posts.Post')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-pub_date', '-post'], name='timeline_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', 'author'], name='timeline_author_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='timelineentry',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_timeline_entry'),
+        ),
+        migrations.RunPython(backfill_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations
+
+
+# the schema as of this migration, deliberately not imported from
+# posts.search so later changes there can not rewrite history
+CREATE_INDEX = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5("
+    "text, content='posts_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    'CREATE TRIGGER IF NOT EXISTS posts_post_fts_ai '
+    'AFTER INSERT ON posts_post BEGIN '
+    'INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); '
+    'END',
+    'CREATE TRIGGER IF NOT EXISTS posts_post_fts_ad '
+    'AFTER DELETE ON posts_post BEGIN '
+    'INSERT INTO posts_post_fts(posts_post_fts, rowid, text) '
+    "VALUES ('delete', old.id, old.text); "
+    'END',
+    'CREATE TRIGGER IF NOT EXISTS posts_post_fts_au '
+    'AFTER UPDATE OF text ON posts_post BEGIN '
+    'INSERT INTO posts_post_fts(posts_post_fts, rowid, text) '
+    "VALUES ('delete', old.id, old.text); "
+    'INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); '
+    'END',
+    "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')",
+]
+
+DROP_INDEX = [
+    'DROP TRIGGER IF EXISTS posts_post_fts_ai',
+    'DROP TRIGGER IF EXISTS posts_post_fts_ad',
+    'DROP TRIGGER IF EXISTS posts_post_fts_au',
+    'DROP TABLE IF EXISTS posts_post_fts',
+]
+
+
+def run_on_sqlite(statements):
+    # other backends search with icontains and need no index
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_timeline'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_INDEX), run_on_sqlite(DROP_INDEX)
+        ),
+    ]
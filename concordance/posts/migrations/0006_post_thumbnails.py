@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='thumbnails',
+            field=models.TextField(blank=True, editable=False, help_text='JSON map of pre-generated thumbnails', verbose_name='Thumbnails'),
+        ),
+    ]
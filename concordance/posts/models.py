@@ -2,7 +2,7 @@ from django.db import models
 from django.db.models import F, Q
 from django.contrib.auth import get_user_model
 from django.shortcuts import reverse
-from core.models import CreatedModel
+from core.models import AtomicSaveModel, CreatedModel
 
 
 POST_REPR = '{author} ({timestamp}): "{snippet}"'
@@ -35,9 +35,24 @@ class Post(CreatedModel):
         blank=True,
         help_text='Image file'
     )
+    comments_count = models.PositiveIntegerField(
+        'Comments count',
+        default=0,
+        editable=False,
+    )
+    thumbnails = models.TextField(
+        'Thumbnails',
+        blank=True,
+        editable=False,
+        help_text='JSON map of pre-generated thumbnails',
+    )
+
+    # written out of band (F() updates, thumbnail workers),
+    # never written back by a regular save
+    DERIVED_FIELDS = ('comments_count', 'thumbnails')
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
 
     def __str__(self):
         return POST_REPR.format(
@@ -49,6 +64,17 @@ class Post(CreatedModel):
     def get_absolute_url(self):
         return reverse('posts:post_detail', args=(self.id,))
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DERIVED_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 
 class Comment(CreatedModel):
     post = models.ForeignKey(
@@ -80,7 +106,7 @@ class Group(models.Model):
         return reverse('posts:group_list', args=(self.slug,))
 
 
-class Follow(models.Model):
+class Follow(AtomicSaveModel):
     user = models.ForeignKey(
         User,
         related_name='follower',
@@ -101,3 +127,60 @@ class Follow(models.Model):
                 check=~Q(user=F('author')), name="don't follow yourself"
             )
         ]
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name='stats',
+        on_delete=models.CASCADE,
+    )
+    posts_count = models.PositiveIntegerField('Posts count', default=0)
+    followers_count = models.PositiveIntegerField('Followers count', default=0)
+    following_count = models.PositiveIntegerField('Following count', default=0)
+
+    class Meta:
+        verbose_name_plural = 'User stats'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.posts_count} posts'
+
+
+class TimelineEntry(models.Model):
+    """A post materialized into one follower's timeline."""
+    user = models.ForeignKey(
+        User,
+        related_name='timeline',
+        on_delete=models.CASCADE,
+        # covered by the composite indexes below
+        db_index=False,
+    )
+    post = models.ForeignKey(
+        Post,
+        related_name='timeline_entries',
+        on_delete=models.CASCADE
+    )
+    # copies of the post's columns so reads and trims never join
+    author = models.ForeignKey(
+        User,
+        related_name='+',
+        on_delete=models.CASCADE
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_timeline_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_range_idx',
+            ),
+            models.Index(
+                fields=['user', 'author'], name='timeline_author_idx'
+            ),
+        ]
@@ -0,0 +1,112 @@
+"""Full-text search over post text.
+
+On SQLite the text is indexed by an external-content FTS5 table kept in
+sync by triggers, so matching is an index lookup ranked by bm25 instead
+of a ``LIKE '%...%'`` scan. Other backends fall back to ``icontains``.
+"""
+from django.db import connection, connections
+
+from .models import Post
+
+
+FTS_TABLE = 'posts_post_fts'
+
+FTS_SCHEMA = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "text, content='posts_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')"
+)
+
+FTS_TRIGGERS = {
+    f'{FTS_TABLE}_ai': (
+        'AFTER INSERT ON posts_post BEGIN '
+        f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); '
+        'END'
+    ),
+    f'{FTS_TABLE}_ad': (
+        'AFTER DELETE ON posts_post BEGIN '
+        f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) '
+        "VALUES ('delete', old.id, old.text); "
+        'END'
+    ),
+    f'{FTS_TABLE}_au': (
+        'AFTER UPDATE OF text ON posts_post BEGIN '
+        f'INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) '
+        "VALUES ('delete', old.id, old.text); "
+        f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); '
+        'END'
+    ),
+}
+
+
+def is_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install(using=connection):
+    """Create the index and its triggers where they are missing.
+
+    SQLite drops triggers whenever a migration rebuilds ``posts_post``,
+    so this runs after every ``migrate`` and reindexes if it had to
+    restore any of them.
+    """
+    if not is_supported(using):
+        return
+    if Post._meta.db_table not in using.introspection.table_names():
+        return
+    with using.cursor() as cursor:
+        cursor.execute(FTS_SCHEMA)
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            'AND tbl_name = %s', ['posts_post']
+        )
+        existing = {name for name, in cursor.fetchall()}
+        missing = set(FTS_TRIGGERS) - existing
+        for name in missing:
+            cursor.execute(
+                f'CREATE TRIGGER {name} {FTS_TRIGGERS[name]}'
+            )
+    if missing:
+        rebuild(using)
+
+
+def rebuild(using=connection):
+    if not is_supported(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def match_expression(query):
+    """Turn free user input into an FTS5 query of quoted terms.
+
+    Quoting keeps operators and punctuation typed by users from being
+    parsed as FTS5 syntax; the last term also matches as a prefix.
+    """
+    terms = ['"{}"'.format(term.replace('"', '""')) for term in query.split()]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_posts(query, queryset=None):
+    """Posts matching ``query``, best matches first."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    expression = match_expression(query or '')
+    if not expression:
+        return queryset.none()
+    if not is_supported(connections[queryset.db]):
+        return queryset.filter(text__icontains=query)
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = posts_post.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[expression],
+        select={'rank': f'{FTS_TABLE}.rank'},
+        order_by=['rank'],
+    )
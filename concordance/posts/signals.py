@@ -0,0 +1,169 @@
+import threading
+
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete,
+)
+from django.dispatch import receiver
+
+from . import counters, feed_cache, follow_graph, thumbnails, timeline
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    # read through __dict__ so deferred loading is never triggered
+    instance._initial_group_id = instance.__dict__.get('group_id')
+
+
+def image_name(value):
+    # a raw name straight from the database or a FieldFile once accessed
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance, **kwargs):
+    instance._initial_image = image_name(instance.__dict__.get('image'))
+
+
+@receiver([post_save, post_delete], sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    feed_cache.invalidate(
+        f'card:post:{instance.pk}',
+        *feed_cache.post_scopes(instance, (instance._initial_group_id,))
+    )
+    instance._initial_group_id = instance.group_id
+
+
+# posts whose delete is cascading to their comments on this thread
+_deleting = threading.local()
+
+
+def deleting_posts():
+    if not hasattr(_deleting, 'posts'):
+        _deleting.posts = set()
+    return _deleting.posts
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    deleting_posts().add(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_gone(sender, instance, **kwargs):
+    deleting_posts().discard(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comment_feeds(sender, instance, **kwargs):
+    if instance.post_id in deleting_posts():
+        # the post invalidates on its own
+        return
+    feed_cache.invalidate(*feed_cache.comment_scopes(instance.post_id))
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_group_feeds(sender, instance, **kwargs):
+    feed_cache.invalidate(
+        'groups', f'group:{instance.pk}', f'card:group:{instance.pk}'
+    )
+
+
+# user fields shown on post cards
+CARD_USER_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def card_fields(user):
+    return tuple(user.__dict__.get(name) for name in CARD_USER_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_card_fields(sender, instance, **kwargs):
+    instance._initial_card_fields = card_fields(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_cards(sender, instance, created, **kwargs):
+    # logins save last_login only and keep every card
+    fields = card_fields(instance)
+    if not created and fields != instance._initial_card_fields:
+        # cached feed pages hold the old name as well
+        group_ids = Post.objects.filter(
+            author=instance, group__isnull=False
+        ).values_list('group_id', flat=True).distinct()
+        feed_cache.invalidate(
+            f'card:user:{instance.pk}', 'index', f'profile:{instance.pk}',
+            *(f'group:{group_id}' for group_id in group_ids)
+        )
+    instance._initial_card_fields = fields
+
+
+@receiver(post_save, sender=User)
+def create_user_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_user(instance.author_id, posts_count=1)
+        timeline.fan_out(instance)
+
+
+@receiver(post_save, sender=Post)
+def queue_thumbnails(sender, instance, created, raw=False, **kwargs):
+    if raw or 'image' in instance.get_deferred_fields():
+        return
+    image = image_name(instance.image)
+    if image == instance._initial_image:
+        return
+    instance._initial_image = image
+    if not created:
+        instance.thumbnails = ''
+        Post.objects.filter(pk=instance.pk).update(thumbnails='')
+    if image:
+        thumbnails.queue(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_user(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_post(instance.post_id, comments_count=1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id in deleting_posts():
+        # the count goes with the post row
+        return
+    counters.change_post(instance.post_id, comments_count=-1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        follow_graph.record(instance.user_id, instance.author_id, True)
+        counters.change_user(instance.user_id, following_count=1)
+        counters.change_user(instance.author_id, followers_count=1)
+        timeline.backfill(instance.user_id, instance.author_id)
+        feed_cache.invalidate(
+            f'user:{instance.user_id}', f'user:{instance.author_id}'
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    follow_graph.record(instance.user_id, instance.author_id, False)
+    counters.change_user(instance.user_id, following_count=-1)
+    counters.change_user(instance.author_id, followers_count=-1)
+    timeline.trim(instance.user_id, instance.author_id)
+    timeline.unfollowed(instance.author_id)
+    feed_cache.invalidate(
+        f'user:{instance.user_id}', f'user:{instance.author_id}'
+    )
@@ -0,0 +1,11 @@
+from django import template
+
+from posts.cards import render_cards
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts, variant):
+    return render_cards(posts, variant, context.template.engine)
@@ -0,0 +1,11 @@
+from django import template
+
+from posts.thumbnails import thumbnail_of
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnail(post, alias):
+    return thumbnail_of(post, alias)
@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.cards import render_cards
+from posts.models import Group, Post, User
+
+
+class PostCardsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='leland', first_name='Leland', last_name='Palmer'
+        )
+        cls.group = Group.objects.create(
+            title='Roadhouse', slug='roadhouse', description='Bar'
+        )
+        cls.post = Post.objects.create(
+            text='original', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def render(self):
+        posts = Post.objects.select_related('author', 'group')
+        card, = render_cards(posts, 'index')
+        return card
+
+    def edit_behind_signals(self):
+        # bypasses every signal, so a fresh card would show the new text
+        Post.objects.filter(pk=self.post.pk).update(text='stale')
+
+    def test_cards_are_cached(self):
+        """test if a rendered card is reused until the post changes"""
+        self.assertIn('original', self.render())
+        self.edit_behind_signals()
+        self.assertIn('original', self.render())
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'edited'
+        post.save()
+        self.assertIn('edited', self.render())
+
+    def test_author_rename(self):
+        """test if renaming the author re-renders the card"""
+        self.render()
+        self.edit_behind_signals()
+        self.author.first_name = 'Bob'
+        self.author.save()
+        card = self.render()
+        self.assertIn('Bob Palmer', card)
+
+    def test_login_keeps_cards(self):
+        """test if a save of last_login alone keeps the cached cards"""
+        self.render()
+        self.edit_behind_signals()
+        author = User.objects.get(pk=self.author.pk)
+        author.last_login = timezone.now()
+        author.save(update_fields=['last_login'])
+        self.assertIn('original', self.render())
+
+    def test_group_rename(self):
+        """test if renaming the group re-renders the card"""
+        self.render()
+        self.group.title = 'One Eyed Jacks'
+        self.group.save()
+        self.assertIn('One Eyed Jacks', self.render())
+
+    def test_feed_pages(self):
+        """test if feed pages are assembled from the cards"""
+        pages = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+        )
+        for url in pages:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, 'original')
+                self.assertContains(response, reverse(
+                    'posts:post_detail', args=(self.post.id,)
+                ))
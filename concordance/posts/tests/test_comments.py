@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Post
+
+
+User = get_user_model()
+
+
+@override_settings(COMMENTS_PER_PAGE=3)
+class CommentPagesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='leland')
+        cls.post = Post.objects.create(text='text', author=cls.author)
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.author, text=f'comment {n}')
+            for n in range(7)
+        )
+        cls.expected = list(
+            Comment.objects.order_by('pub_date', 'id')
+            .values_list('text', flat=True)
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cache.clear()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_detail_first_page(self):
+        """test if post detail renders the first chunk of comments"""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.id,))
+        )
+        comments = response.context['comments']
+        self.assertEqual(
+            [comment.text for comment in comments], self.expected[:3]
+        )
+        self.assertContains(
+            response, reverse('posts:post_comments', args=(self.post.id,))
+        )
+
+    def test_load_more(self):
+        """test if fragments walk every comment once"""
+        url = reverse('posts:post_comments', args=(self.post.id,))
+        received = []
+        cursor = ''
+        while cursor is not None:
+            response = self.client.get(url, {'cursor': cursor})
+            self.assertTemplateUsed(
+                response, 'posts/includes/comment_list.html'
+            )
+            comments = response.context['comments']
+            received.extend(comment.text for comment in comments)
+            cursor = comments.next_cursor
+        self.assertEqual(received, self.expected)
+        missing = reverse('posts:post_comments', args=(self.post.id + 1,))
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_api_pages(self):
+        """test if the api serves keyset pages with one post lookup"""
+        client = APIClient()
+        client.force_authenticate(self.author)
+        url = reverse('api:comments-list', args=(self.post.id,))
+        with self.assertNumQueries(2):
+            response = client.get(url, {'limit': 3})
+        received = [comment['text'] for comment in response.data['results']]
+        while response.data['next']:
+            response = client.get(response.data['next'])
+            received.extend(
+                comment['text'] for comment in response.data['results']
+            )
+        self.assertEqual(received, self.expected)
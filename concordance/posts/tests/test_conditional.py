@@ -0,0 +1,134 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.shortcuts import reverse
+from django.test import Client, TestCase
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Follow, Group, Post
+
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(title='Roadhouse', slug='roadhouse')
+        cls.author = User.objects.create_user(username='cooper')
+        cls.reader = User.objects.create_user(username='truman')
+        cls.post = Post.objects.create(
+            text='text', author=cls.author, group=cls.group
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cache.clear()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(self.reader)
+
+    def assertNotModified(self, client, url, **headers):
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag, **headers)
+        self.assertEqual(response.status_code, 304)
+        return etag
+
+    def test_pages_not_modified(self):
+        """test if unchanged pages are answered with 304"""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:post_detail', args=(self.post.id,)),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertNotModified(self.guest_client, url)
+
+    def test_not_modified_skips_queries(self):
+        """test if a 304 for a feed runs no database query"""
+        url = reverse('posts:index')
+        etag = self.guest_client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since(self):
+        """test if anonymous viewers can revalidate by date"""
+        url = reverse('posts:index')
+        response = self.guest_client.get(url)
+        response = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate(self):
+        """test if writes change the validators of affected pages"""
+        detail = reverse('posts:post_detail', args=(self.post.id,))
+        profile = reverse('posts:profile', args=(self.author.username,))
+        detail_etag = self.assertNotModified(self.guest_client, detail)
+        Comment.objects.create(post=self.post, author=self.reader, text='!')
+        response = self.guest_client.get(
+            detail, HTTP_IF_NONE_MATCH=detail_etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '!')
+
+        client = Client()
+        client.force_login(self.reader)
+        profile_etag = self.assertNotModified(client, profile)
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = client.get(profile, HTTP_IF_NONE_MATCH=profile_etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_comments_keep_feeds(self):
+        """test if a comment changes its post but none of the feeds"""
+        index = reverse('posts:index')
+        posts = reverse('api:posts-list')
+        index_etag = self.assertNotModified(self.guest_client, index)
+        posts_etag = self.assertNotModified(self.api_client, posts)
+        Comment.objects.create(post=self.post, author=self.reader, text='!')
+        response = self.guest_client.get(
+            index, HTTP_IF_NONE_MATCH=index_etag
+        )
+        self.assertEqual(response.status_code, 304)
+        response = self.api_client.get(posts, HTTP_IF_NONE_MATCH=posts_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['comments_count'], 1)
+
+    def test_validators_per_viewer(self):
+        """test if a page validated for one viewer is rendered for another"""
+        url = reverse('posts:index')
+        etag = self.guest_client.get(url)['ETag']
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+
+    def test_api_not_modified(self):
+        """test if polling api clients get 304 until something changes"""
+        urls = [
+            reverse('api:posts-list'),
+            reverse('api:posts-detail', args=(self.post.id,)),
+            reverse('api:comments-list', args=(self.post.id,)),
+            reverse('api:groups-list'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertNotModified(self.api_client, url)
+        comments = reverse('api:comments-list', args=(self.post.id,))
+        etag = self.api_client.get(comments)['ETag']
+        with self.assertNumQueries(0):
+            response = self.api_client.get(comments, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Comment.objects.create(post=self.post, author=self.reader, text='!')
+        response = self.api_client.get(comments, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
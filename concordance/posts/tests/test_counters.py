@@ -0,0 +1,108 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.shortcuts import reverse
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+
+from posts.models import Post, Comment, Follow, UserStats
+
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='vato')
+        cls.reader = User.objects.create_user(username='loco')
+        cls.post = Post.objects.create(text='counted', author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        cache.clear()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    @staticmethod
+    def stats(user):
+        return UserStats.objects.get(user=user)
+
+    def test_post_counter(self):
+        """test if posts count follows creation and deletion"""
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        post = Post.objects.create(text='another one', author=self.author)
+        self.assertEqual(self.stats(self.author).posts_count, 2)
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+
+    def test_comment_counter(self):
+        """test if comments count follows the add_comment view"""
+        self.reader_client.post(
+            reverse('posts:add_comment', args=(self.post.id,)),
+            data={'text': 'first'},
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+        Comment.objects.get(post=self.post).delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 0)
+
+    def test_post_delete_skips_comments(self):
+        """test if deleting a post costs the same however many comments"""
+        counts = []
+        for comments in (1, 50):
+            post = Post.objects.create(text='doomed', author=self.author)
+            Comment.objects.bulk_create(
+                Comment(post=post, author=self.reader, text=str(number))
+                for number in range(comments)
+            )
+            with CaptureQueriesContext(connection) as queries:
+                post.delete()
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_editing_keeps_counters(self):
+        """test if saving a stale instance does not overwrite counters"""
+        stale = Post.objects.get(id=self.post.id)
+        Comment.objects.create(post=self.post, author=self.reader, text='x')
+        stale.text = 'edited'
+        stale.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text, 'edited')
+        self.assertEqual(self.post.comments_count, 1)
+
+    def test_follow_counters(self):
+        """test if follow views keep both sides' counters"""
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=(self.author.username,))
+        )
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,))
+        )
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+
+    def test_reconcile(self):
+        """test if the management command repairs drifted counters"""
+        Post.objects.bulk_create(
+            Post(text=f'bulk {number}', author=self.author)
+            for number in range(3)
+        )
+        Follow.objects.bulk_create(
+            [Follow(user=self.reader, author=self.author)]
+        )
+        UserStats.objects.filter(user=self.reader).delete()
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertEqual(self.stats(self.author).posts_count, 4)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
@@ -0,0 +1,119 @@
+from django.core.cache import cache
+from django.db import connection
+from django.shortcuts import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from posts import follow_graph
+from posts.models import Follow, User
+
+
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='bobby')
+        cls.author = User.objects.create_user(username='shelly')
+        cls.other = User.objects.create_user(username='leo')
+        Follow.objects.create(user=cls.reader, author=cls.other)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def tearDown(self):
+        cache.clear()
+
+    def follow_queries(self, queries):
+        return [
+            query['sql'] for query in queries
+            if 'FROM "posts_follow"' in query['sql']
+        ]
+
+    def test_following_cached(self):
+        """test if the followed ids are read from the database once"""
+        self.assertEqual(
+            follow_graph.following(self.reader.pk), {self.other.pk}
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(
+                follow_graph.is_following(self.reader.pk, self.other.pk)
+            )
+        self.assertEqual(len(queries), 0)
+
+    def test_written_through(self):
+        """test if following and unfollowing update the cached graph"""
+        follow_graph.following(self.reader.pk)
+        self.assertEqual(follow_graph.followers_count(self.author.pk), 0)
+        self.client.get(
+            reverse('posts:profile_follow', args=(self.author.username,))
+        )
+        self.assertTrue(
+            follow_graph.is_following(self.reader.pk, self.author.pk)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            follow_graph.is_following(self.reader.pk, self.author.pk)
+            self.assertEqual(follow_graph.followers_count(self.author.pk), 1)
+        self.assertEqual(len(queries), 0)
+        self.client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,))
+        )
+        self.assertFalse(
+            follow_graph.is_following(self.reader.pk, self.author.pk)
+        )
+        self.assertEqual(follow_graph.followers_count(self.author.pk), 0)
+
+    def test_writes_ignore_stale_graph(self):
+        """test if following and unfollowing act on the database"""
+        cache.set(
+            follow_graph.FOLLOWING_KEY.format(self.reader.pk),
+            frozenset({self.author.pk}),
+        )
+        self.client.get(
+            reverse('posts:profile_follow', args=(self.author.username,))
+        )
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, author=self.author
+        ).exists())
+        cache.set(
+            follow_graph.FOLLOWING_KEY.format(self.reader.pk), frozenset()
+        )
+        response = self.client.get(
+            reverse('posts:profile_follow', args=(self.author.username,)),
+            follow=True,
+        )
+        self.assertEqual(list(response.context['messages']), [])
+        self.client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,))
+        )
+        self.assertFalse(Follow.objects.filter(
+            user=self.reader, author=self.author
+        ).exists())
+
+    def test_follow_button(self):
+        """test if the profile follow state needs no follow query"""
+        follow_graph.following(self.reader.pk)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:profile', args=(self.other.username,))
+            )
+        self.assertTrue(response.context['following'])
+        self.assertEqual(self.follow_queries(queries), [])
+
+    def test_api_follow(self):
+        """test if the api creates, lists and rejects duplicate follows"""
+        client = APIClient()
+        client.force_authenticate(self.reader)
+        url = reverse('api:follow-list')
+        response = client.post(url, {'following': self.author.username})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['following'], self.author.username)
+        response = client.post(url, {'following': self.author.username})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['following'], ['Already following'])
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {follow['following'] for follow in response.data['results']},
+            {self.author.username, self.other.username},
+        )
@@ -0,0 +1,122 @@
+import io
+import json
+import shutil
+import tempfile
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.shortcuts import reverse
+from django.test import TransactionTestCase, override_settings
+from PIL import Image, features
+from rest_framework.test import APIClient
+
+from posts.images import normalize
+from posts.models import Post
+from posts.thumbnails import thumbnail_of
+
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+ORIENTATION = 0x0112
+
+
+def upload(size=(800, 400), mode='RGB', image_format='jpeg', **options):
+    image = Image.new(mode, size, 'red')
+    content = io.BytesIO()
+    image.save(content, format=image_format, **options)
+    return SimpleUploadedFile(
+        f'upload.{image_format}', content.getvalue(),
+        content_type=f'image/{image_format}',
+    )
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0, POST_IMAGE_MAX_SIZE=200,
+)
+class ImageNormalizationTest(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='audrey')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_downscaled_and_stripped(self):
+        """test if uploads are downscaled, turned upright and stripped"""
+        exif = Image.Exif()
+        exif[ORIENTATION] = 6
+        image = Image.open(normalize(upload(exif=exif.tobytes())))
+        self.assertEqual(image.format, 'JPEG')
+        # rotated by the orientation tag before it was dropped
+        self.assertEqual(image.size, (100, 200))
+        self.assertNotIn('exif', image.info)
+
+    def test_transparency_kept(self):
+        """test if images with transparency are stored as PNG"""
+        image = Image.open(normalize(upload(mode='RGBA', image_format='png')))
+        self.assertEqual((image.format, image.mode), ('PNG', 'RGBA'))
+
+    def test_form_upload(self):
+        """test if images posted through the form are normalized"""
+        self.client.force_login(self.author)
+        self.client.post(
+            reverse('posts:post_create'), {'text': 'form', 'image': upload()}
+        )
+        post = Post.objects.get(text='form')
+        self.assertTrue(post.image.name.endswith('.jpg'))
+        self.assertEqual((post.image.width, post.image.height), (200, 100))
+
+    def test_api_upload(self):
+        """test if images posted through the API are normalized"""
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.post(
+            reverse('api:posts-list'),
+            {'text': 'api', 'image': upload(image_format='png')},
+            format='multipart',
+        )
+        self.assertEqual(response.status_code, 201)
+        post = Post.objects.get(text='api')
+        self.assertTrue(post.image.name.endswith('.jpg'))
+        self.assertEqual((post.image.width, post.image.height), (200, 100))
+
+    def test_srcset(self):
+        """test if larger variants are offered through srcset"""
+        post = Post.objects.create(
+            text='text', author=self.author,
+            image=SimpleUploadedFile('big.jpg', upload((2400, 1200)).read()),
+        )
+        post.refresh_from_db()
+        stored = json.loads(post.thumbnails)
+        self.assertEqual(stored['preview@2x'][1:], [600, 300])
+        self.assertEqual(stored['cover@2x'][1:], [1920, 678])
+        cover = thumbnail_of(post, 'cover')
+        self.assertEqual([density for _, density in cover.variants], [
+            '1x', '2x'
+        ])
+        response = self.client.get(post.get_absolute_url())
+        self.assertContains(response, f'srcset="{cover.srcset}"')
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.get(reverse('api:posts-detail', args=(post.id,)))
+        self.assertIn(' 2x', response.data['srcsets']['cover']['default'])
+
+    @skipUnless(features.check('webp'), 'Pillow is built without WebP')
+    def test_webp_variants(self):
+        """test if every variant gets a WebP sibling"""
+        post = Post.objects.create(
+            text='text', author=self.author,
+            image=SimpleUploadedFile('big.jpg', upload((2400, 1200)).read()),
+        )
+        post.refresh_from_db()
+        stored = json.loads(post.thumbnails)
+        self.assertTrue(stored['cover.webp'][0].endswith('.webp'))
+        response = self.client.get(post.get_absolute_url())
+        self.assertContains(response, 'type="image/webp"')
@@ -0,0 +1,141 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+from posts.search import search_posts
+
+
+User = get_user_model()
+
+
+class ImportDataTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        cls.author = User.objects.create_user(username='bobby')
+        cls.reader = User.objects.create_user(username='james')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        cache.clear()
+        super().tearDownClass()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            file.write(content)
+        return path
+
+    def test_round_trip(self):
+        """test if an export loads back with dates and derived data"""
+        group = Group.objects.create(title='Mill', slug='mill')
+        post = Post.objects.create(
+            text='saw mill', author=self.author, group=group
+        )
+        published = timezone.now() - timedelta(days=30)
+        Post.objects.filter(pk=post.pk).update(pub_date=published)
+        Comment.objects.create(post=post, author=self.reader, text='wood')
+        Follow.objects.create(user=self.reader, author=self.author)
+        dump = StringIO()
+        call_command('export_data', stdout=dump)
+        for model in (Post, Group, Follow):
+            model.objects.all().delete()
+
+        output = StringIO()
+        call_command(
+            'import_data', self.write('dump.ndjson', dump.getvalue()),
+            stdout=output,
+        )
+        self.assertIn('rows/s', output.getvalue())
+        post = Post.objects.get()
+        self.assertEqual(post.group.slug, 'mill')
+        self.assertEqual(
+            post.pub_date.replace(microsecond=0),
+            published.replace(microsecond=0),
+        )
+        self.assertEqual(post.comments.get().text, 'wood')
+        self.assertEqual(post.comments_count, 1)
+        self.author.stats.refresh_from_db()
+        self.assertEqual(self.author.stats.followers_count, 1)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(list(search_posts('saw')), [post])
+
+    def test_reimport(self):
+        """test if an export loads back into the database it came from"""
+        group = Group.objects.create(title='Mill', slug='mill')
+        post = Post.objects.create(
+            text='saw mill', author=self.author, group=group
+        )
+        Comment.objects.create(post=post, author=self.reader, text='wood')
+        Follow.objects.create(user=self.reader, author=self.author)
+        dump = StringIO()
+        call_command('export_data', stdout=dump)
+
+        output = StringIO()
+        call_command(
+            'import_data', self.write('dump.ndjson', dump.getvalue()),
+            stdout=output,
+        )
+        self.assertIn('skipped 1: group already exists', output.getvalue())
+        self.assertEqual(Group.objects.count(), 1)
+        self.assertEqual(
+            list(Post.objects.values_list('group', flat=True)),
+            [group.pk, group.pk],
+        )
+        copy = Post.objects.exclude(pk=post.pk).get()
+        self.assertEqual(copy.comments.get().text, 'wood')
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_existing_group(self):
+        """test if a group record with a taken slug is skipped"""
+        Group.objects.create(title='Mill', slug='mill')
+        path = self.write('groups.csv', (
+            'slug,title\r\n'
+            'mill,Packard mill\r\n'
+            'diner,Double R\r\n'
+        ))
+        output = StringIO()
+        call_command('import_data', path, type='group', stdout=output)
+        self.assertEqual(
+            sorted(Group.objects.values_list('slug', 'title')),
+            [('diner', 'Double R'), ('mill', 'Mill')],
+        )
+        self.assertIn('skipped 1: group already exists', output.getvalue())
+
+    def test_csv(self):
+        """test if csv rows resolve and create authors"""
+        path = self.write('posts.csv', (
+            'author,text,pub_date,group\r\n'
+            'bobby,first,2020-01-01T10:00:00,\r\n'
+            'lucy,second,,\r\n'
+            'bobby,,2020-01-02T10:00:00,\r\n'
+            'bobby,third,2020-01-03T10:00:00,missing\r\n'
+        ))
+        output = StringIO()
+        call_command(
+            'import_data', path, type='post', create_users=True,
+            stdout=output,
+        )
+        self.assertEqual(
+            sorted(Post.objects.values_list('author__username', 'text')),
+            [('bobby', 'first'), ('lucy', 'second')],
+        )
+        self.assertEqual(
+            Post.objects.get(text='first').pub_date.year, 2020
+        )
+        self.assertIn('skipped 1: post without text', output.getvalue())
+        self.assertIn('skipped 1: unknown group', output.getvalue())
@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.urls import get_resolver
+
+from core import loadtest
+from posts import counters
+from posts.models import Comment, Follow, Post, TimelineEntry, User
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class LoadTestHarnessTest(TransactionTestCase):
+    def setUp(self):
+        call_command(
+            'seed_data', users=30, posts=120, comments=60, groups=3,
+            follows=5, images=2, batch=50, stdout=StringIO(),
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_seeded_dataset(self):
+        """test if the seeded dataset is consistent"""
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Post.objects.count(), 120)
+        self.assertEqual(Comment.objects.count(), 60)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+        self.assertTrue(Post.objects.exclude(thumbnails='').exists())
+        self.assertEqual(counters.reconcile(), 0)
+
+    def test_every_route_covered(self):
+        """test if the traffic mix covers every posts and api route"""
+        routes = {
+            f'{namespace}:{name}'
+            for namespace in ('posts', 'api')
+            for name in get_resolver().namespace_dict[namespace][1]
+            .reverse_dict if isinstance(name, str)
+        }
+        covered = {scenario.route for scenario in loadtest.SCENARIOS}
+        self.assertEqual(routes - covered - loadtest.SKIPPED_ROUTES, set())
+
+    def test_report(self):
+        """test if the driver reports percentiles for every endpoint"""
+        path = os.path.join(TEMP_MEDIA_ROOT, 'result.json')
+        call_command(
+            'loadtest', requests=60, output=path, stdout=StringIO(),
+        )
+        with open(path) as file:
+            result = json.load(file)
+        self.assertEqual(
+            len(result['endpoints']),
+            len({(s.method, s.route) for s in loadtest.SCENARIOS}),
+        )
+        for name, stats in result['endpoints'].items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(stats['errors'], 0, stats['statuses'])
+                self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
@@ -27,16 +27,20 @@ class PostModelTest(TestCase):
             author=User.objects.create_user(username='wacko wacko'),
             group=cls.group,
         )
-        field_names = ['text', 'pub_date', 'author', 'group', 'image']
+        field_names = [
+            'text', 'pub_date', 'author', 'group', 'image',
+            'comments_count', 'thumbnails'
+        ]
         verbose_names = [
             'Post text', 'Object creation date',
-            'Author', 'Group', 'Image'
+            'Author', 'Group', 'Image', 'Comments count', 'Thumbnails'
         ]
         cls.EXPECTED_LABELS = dict(zip(field_names, verbose_names))
         cls.EXPECTED_HELP_TEXTS = {
             'text': 'Text content of the post',
             'group': 'Associated group',
             'image': 'Image file',
+            'thumbnails': 'JSON map of pre-generated thumbnails',
         }
 
     @classmethod
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.shortcuts import reverse
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.testing import QueryBudgetMixin
+from posts.models import Comment, Follow, Group, Post
+
+
+User = get_user_model()
+
+
+class PostsQueryBudgetTest(QueryBudgetMixin, TestCase):
+    QUERY_BUDGETS = {
+        'posts:index': 3,
+        'posts:group_list': 5,
+        'posts:profile': 5,
+        'posts:post_detail': 5,
+        'posts:post_comments': 3,
+        'posts:follow_index': 4,
+        'posts:search': 4,
+        'api:posts-list': 2,
+        'api:comments-list': 3,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(title='Bookhouse', slug='bookhouse')
+        cls.reader = User.objects.create_user(username='hawk')
+        cls.authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(3)
+        ]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.reader, author=author)
+            for number in range(5):
+                Post.objects.create(
+                    text=f'post {number}', author=author, group=cls.group
+                )
+        cls.post = Post.objects.first()
+        for author in cls.authors:
+            Comment.objects.create(post=cls.post, author=author, text='hm')
+
+    @classmethod
+    def tearDownClass(cls):
+        cache.clear()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def test_pages_within_budget(self):
+        """test if html views stay within their query budgets"""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.authors[0].username,)),
+            reverse('posts:post_detail', args=(self.post.id,)),
+            reverse('posts:post_comments', args=(self.post.id,)),
+            reverse('posts:follow_index'),
+            reverse('posts:search') + '?q=post',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertWithinBudget(response)
+
+    def test_api_within_budget(self):
+        """test if api views stay within their query budgets"""
+        client = APIClient()
+        client.force_authenticate(self.reader)
+        urls = [
+            reverse('api:posts-list'),
+            reverse('api:comments-list', args=(self.post.id,)),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertWithinBudget(response)
+
+    def test_headers(self):
+        """test if query stats are exposed in response headers"""
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response['X-Query-View'], 'posts:index')
+        self.assertEqual(
+            int(response['X-Query-Count']), response.query_stats.count
+        )
+        self.assertIn('X-Query-Time', response)
+        self.assertIn('X-Query-Duplicates', response)
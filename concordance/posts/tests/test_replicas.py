@@ -0,0 +1,142 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core import routers
+from posts.cards import render_cards
+from posts.models import Follow, Post, User
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaRoutingTest(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        # a file copy of the test database stands in for the replica
+        connections.databases['replica'] = {
+            **connections.databases['default'],
+            'NAME': os.path.join(cls.directory.name, 'replica.sqlite3'),
+            'TEST': {},
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.databases['replica']
+        cls.directory.cleanup()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='harry')
+        Post.objects.create(text='synced post', author=self.user)
+        call_command('sync_replicas', stdout=StringIO())
+        Post.objects.create(text='fresh post', author=self.user)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_feed_reads_replica(self):
+        """test if uncached feed views read from the replica"""
+        response = Client().get(reverse('posts:search'), {'q': 'post'})
+        self.assertContains(response, 'synced post')
+        self.assertNotContains(response, 'fresh post')
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_uncached_views_read_replica(self):
+        """test if pages and api lists that are not cached read the replica"""
+        response = Client().get(reverse('posts:index'), {'page': 1})
+        self.assertContains(response, 'synced post')
+        self.assertNotContains(response, 'fresh post')
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(reverse('api:posts-list'))
+        self.assertContains(response, 'synced post')
+        self.assertNotContains(response, 'fresh post')
+
+    @override_settings(REPLICA_PIN_SECONDS=0)
+    def test_cached_pages_built_on_primary(self):
+        """test if pages that get cached never come from a lagging replica"""
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, 'fresh post')
+
+    def test_recent_changes_read_primary(self):
+        """test if scopes changed within the replica lag read the primary"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(reverse('api:posts-list'))
+        self.assertContains(response, 'fresh post')
+
+    def test_replica_cards_not_cached(self):
+        """test if cards rendered from replica rows are not cached"""
+        render_cards(Post.objects.using('replica').all(), 'index')
+        # an update that bypasses the signals keeps the card versions
+        Post.objects.filter(text='synced post').update(text='edited post')
+        cards = ''.join(render_cards(Post.objects.all(), 'index'))
+        self.assertIn('edited post', cards)
+
+    def test_follow_graph_read_from_primary(self):
+        """test if the cached follow graph is not filled from a replica"""
+        reader = User.objects.create_user(username='ron')
+        call_command('sync_replicas', stdout=StringIO())
+        Follow.objects.create(user=reader, author=self.user)
+        client = Client()
+        client.force_login(reader)
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.status_code, 200)
+        response = client.get(reverse('posts:profile', args=('harry',)))
+        self.assertTrue(response.context['following'])
+
+    def test_other_reads_use_primary(self):
+        """test if reads outside eligible views stay on the primary"""
+        self.assertEqual(Post.objects.count(), 2)
+
+    def test_write_pins_primary(self):
+        """test if a client reads its own writes after posting"""
+        client = Client()
+        client.force_login(self.user)
+        response = client.post(reverse('posts:post_create'), {'text': 'mine'})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+        response = client.get(reverse('posts:index'))
+        self.assertContains(response, 'mine')
+        self.assertContains(response, 'fresh post')
+
+    def test_only_app_writes_pin(self):
+        """test if requests that write no app models leave clients unpinned"""
+        client = Client()
+        client.force_login(self.user)
+        response = client.post(reverse('posts:post_create'), {'text': ''})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_sync(self):
+        """test if syncing brings the replica up to date"""
+        call_command('sync_replicas', stdout=StringIO())
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, 'fresh post')
+
+    def test_reads_after_write_use_primary(self):
+        """test if a request reads from the primary once it wrote"""
+        router = routers.ReplicaRouter()
+        routers.start_request()
+        routers.read_from_replicas()
+        self.assertEqual(router.db_for_read(Post), 'replica')
+        router.db_for_write(Session)
+        self.assertEqual(router.db_for_read(Post), 'replica')
+        router.db_for_write(Post)
+        self.assertIsNone(router.db_for_read(Post))
+        self.assertTrue(routers.end_request())
+        self.assertIsNone(router.db_for_read(Post))
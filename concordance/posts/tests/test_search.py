@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.shortcuts import reverse
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from posts.models import Post
+from posts.search import search_posts
+
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='vato')
+        cls.owls = Post.objects.create(
+            text='Owls are not what they seem', author=cls.author
+        )
+        cls.owls_twice = Post.objects.create(
+            text='Owls, owls everywhere: owls in the woods', author=cls.author
+        )
+        cls.coffee = Post.objects.create(
+            text='Damn fine coffee', author=cls.author
+        )
+        cls.SEARCH = reverse('posts:search')
+
+    @classmethod
+    def tearDownClass(cls):
+        cache.clear()
+        super().tearDownClass()
+
+    def test_ranked_matches(self):
+        """test if matches are found and ranked by relevance"""
+        self.assertEqual(
+            list(search_posts('owls')), [self.owls_twice, self.owls]
+        )
+        self.assertEqual(list(search_posts('coff')), [self.coffee])
+
+    def test_index_follows_writes(self):
+        """test if edits and deletions reach the index"""
+        post = Post.objects.get(id=self.coffee.id)
+        post.text = 'Cherry pie'
+        post.save()
+        self.assertFalse(search_posts('coffee').exists())
+        self.assertEqual(list(search_posts('cherry')), [post])
+        post.delete()
+        self.assertFalse(search_posts('cherry').exists())
+
+    def test_user_input_is_quoted(self):
+        """test if FTS5 syntax typed by users does not break the query"""
+        for query in ('"owls', 'owls AND', 'NEAR(', '*', ':)'):
+            with self.subTest(query=query):
+                list(search_posts(query))
+
+    def test_search_view(self):
+        """test if the search page lists matching posts"""
+        response = self.client.get(self.SEARCH, {'q': 'owls'})
+        self.assertTemplateUsed(response, 'posts/search.html')
+        self.assertEqual(
+            list(response.context['page_obj']), [self.owls_twice, self.owls]
+        )
+
+    def test_api_filter(self):
+        """test if the posts API narrows results with ?q="""
+        client = APIClient()
+        client.force_authenticate(self.author)
+        response = client.get(reverse('api:posts-list'), {'q': 'coffee'})
+        self.assertEqual(
+            [post['id'] for post in response.data['results']],
+            [self.coffee.id]
+        )
@@ -0,0 +1,105 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.db import OperationalError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.db import retry_on_busy
+from posts.models import Comment, Post, User
+
+
+class PragmaTest(TestCase):
+    def test_pragmas_applied(self):
+        """test if new connections get the configured pragmas"""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -20000)
+
+
+@override_settings(SQLITE_BUSY_RETRIES=2, SQLITE_BUSY_BACKOFF=0)
+class RetryOnBusyTest(TransactionTestCase):
+    def flaky(self, failures, message='database is locked'):
+        calls = []
+
+        @retry_on_busy
+        def write():
+            calls.append(connection.in_atomic_block)
+            if len(calls) <= failures:
+                raise OperationalError(message)
+            return 'done'
+        return write, calls
+
+    def test_retried(self):
+        """test if busy transactions are rerun in a transaction"""
+        write, calls = self.flaky(2)
+        self.assertEqual(write(), 'done')
+        self.assertEqual(calls, [True, True, True])
+
+    def test_gives_up(self):
+        """test if the error is raised once the retries are used up"""
+        write, calls = self.flaky(3)
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 3)
+
+    def test_other_errors(self):
+        """test if errors other than a busy database are not retried"""
+        write, calls = self.flaky(1, 'no such table: nope')
+        with self.assertRaises(OperationalError):
+            write()
+        self.assertEqual(len(calls), 1)
+
+    def test_nested(self):
+        """test if a transaction inside another one is not retried"""
+        write, calls = self.flaky(1)
+        with self.assertRaises(OperationalError):
+            with transaction.atomic():
+                write()
+        self.assertEqual(len(calls), 1)
+
+    def test_begin_immediate(self):
+        """test if write transactions take the write lock up front"""
+        with CaptureQueriesContext(connection) as queries:
+            retry_on_busy(lambda: None)()
+        self.assertEqual(queries[0]['sql'], 'BEGIN IMMEDIATE')
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                pass
+        self.assertEqual(queries[0]['sql'], 'BEGIN')
+
+    def test_views_lock_for_the_write(self):
+        """test if a view takes the write lock only to write"""
+        author = User.objects.create_user(username='cooper')
+        post = Post.objects.create(text='post', author=author)
+        self.client.force_login(author)
+        url = reverse('posts:add_comment', args=(post.id,))
+        for text, locks in (('', 0), ('comment', 1)):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(url, {'text': text})
+            self.assertEqual(
+                [query['sql'] for query in queries].count('BEGIN IMMEDIATE'),
+                locks,
+            )
+        self.assertTrue(Comment.objects.filter(text='comment').exists())
+
+
+class WriteBenchmarkTest(TransactionTestCase):
+    def test_benchmark(self):
+        """test if both profiles commit every transaction in the benchmark"""
+        author = User.objects.create_user(username='cooper')
+        Post.objects.create(text='post', author=author)
+        with tempfile.NamedTemporaryFile('r', suffix='.json') as output:
+            call_command(
+                'bench_writes', workers=2, transactions=3,
+                output=output.name, stdout=StringIO(),
+            )
+            result = json.load(output)
+        self.assertEqual(result['tuned']['committed'], 6)
+        self.assertEqual(result['tuned']['locked'], 0)
+        self.assertIn('default', result)
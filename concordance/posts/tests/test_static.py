@@ -0,0 +1,73 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+
+User = get_user_model()
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(STATIC_ROOT=TEMP_STATIC_ROOT)
+class StaticPipelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        with open(os.path.join(TEMP_STATIC_ROOT, 'staticfiles.json')) as file:
+            cls.manifest = json.load(file)['paths']
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_hashed_names(self):
+        """test if collected assets get content hashed names"""
+        hashed = self.manifest['css/concordance.css']
+        self.assertRegex(hashed, r'^css/concordance\.[0-9a-f]{12}\.css$')
+        self.assertTrue(os.path.exists(os.path.join(TEMP_STATIC_ROOT, hashed)))
+
+    def test_precompressed(self):
+        """test if text assets get a gzip copy with the same content"""
+        path = os.path.join(
+            TEMP_STATIC_ROOT, self.manifest['css/concordance.css']
+        )
+        with open(path, 'rb') as original, gzip.open(path + '.gz') as copy:
+            self.assertEqual(copy.read(), original.read())
+
+    def test_pages_link_hashed_assets(self):
+        """test if pages link the stylesheet by its hashed name"""
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(
+            response, '/static/' + self.manifest['css/concordance.css']
+        )
+        self.assertNotContains(response, '<style>')
+
+    def test_post_links_hashed_script(self):
+        """test if the comments script is linked rather than inlined"""
+        author = User.objects.create_user(username='audrey')
+        post = Post.objects.create(text='text', author=author)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(post.id,))
+        )
+        self.assertContains(
+            response, '/static/' + self.manifest['js/comments.js']
+        )
+        self.assertNotContains(response, '<script>')
+
+
+class UncollectedStaticTest(TestCase):
+    def test_plain_names(self):
+        """test if pages still render before collectstatic has run"""
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, '/static/css/concordance.css')
@@ -0,0 +1,73 @@
+import json
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache.backends.dummy import DummyCache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from core.templating import precompile, profile_backend, template_names
+
+DEBUG_PROCESSOR = 'django.template.context_processors.debug'
+
+
+class TemplateProfileTest(SimpleTestCase):
+    def backend(self, profile):
+        return profile_backend(profile, settings.TEMPLATES[0]['DIRS'])
+
+    def test_production_profile(self):
+        """test if production caches templates and skips the debug processor"""
+        engine = self.backend('production').engine
+        self.assertNotIn(DEBUG_PROCESSOR, engine.context_processors)
+        loader, = engine.template_loaders
+        self.assertEqual(type(loader).__name__, 'Loader')
+        self.assertEqual(loader.__module__, 'django.template.loaders.cached')
+
+    def test_development_profile(self):
+        """test if development reloads templates and keeps debug info"""
+        engine = self.backend('development').engine
+        self.assertIn(DEBUG_PROCESSOR, engine.context_processors)
+        self.assertNotIn(
+            'django.template.loaders.cached',
+            [loader.__module__ for loader in engine.template_loaders],
+        )
+
+    def test_settings_follow_profile(self):
+        """test if the settings take their options from the profile"""
+        self.assertEqual(
+            settings.TEMPLATES[0]['OPTIONS'],
+            settings.TEMPLATE_PROFILES[settings.TEMPLATE_PROFILE],
+        )
+
+    def test_precompile(self):
+        """test if every template is compiled into the cached loader"""
+        engine = self.backend('production').engine
+        names = set(template_names(engine))
+        self.assertIn('posts/index.html', names)
+        self.assertEqual(precompile(engine), len(names))
+        loader, = engine.template_loaders
+        self.assertTrue(names <= set(loader.get_template_cache))
+
+    def test_benchmark(self):
+        """test if the benchmark times both profiles for every page size"""
+        with tempfile.NamedTemporaryFile('r', suffix='.json') as output:
+            call_command(
+                'bench_templates', posts=[2, 5], repeat=1,
+                output=output.name, stdout=StringIO(),
+            )
+            report = json.load(output)
+        self.assertEqual(set(report['posts']), {'2', '5'})
+        self.assertEqual(
+            set(report['posts']['5']),
+            {'development', 'production', 'speedup'},
+        )
+
+    def test_benchmark_keeps_shared_cache(self):
+        """test if the benchmark refuses to clear a cache it may share"""
+        caches = {'default': DummyCache('', {})}
+        with mock.patch(
+                'core.management.commands.bench_templates.caches', caches):
+            with self.assertRaises(CommandError):
+                call_command('bench_templates', posts=[2], repeat=1)
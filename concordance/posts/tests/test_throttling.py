@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.shortcuts import reverse
+from django.test import TestCase, override_settings
+
+from posts.models import Comment, Post, User
+
+
+@override_settings(THROTTLE_RATES={'comment': '2/min', 'follow': '2/min'})
+class ViewThrottleTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='norma')
+        cls.author = User.objects.create_user(username='ed')
+        cls.post = Post.objects.create(text='text', author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_comments_throttled(self):
+        """test if comments past the rate get a 429 with Retry-After"""
+        url = reverse('posts:add_comment', args=(self.post.id,))
+        responses = [
+            self.client.post(url, {'text': 'comment'}) for _ in range(3)
+        ]
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [302, 302, 429],
+        )
+        self.assertGreater(int(responses[-1]['Retry-After']), 0)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_follows_throttled(self):
+        """test if follow and unfollow share one limit"""
+        username = self.author.username
+        statuses = [
+            self.client.get(reverse(name, args=(username,))).status_code
+            for name in (
+                'posts:profile_follow', 'posts:profile_unfollow',
+                'posts:profile_follow',
+            )
+        ]
+        self.assertEqual(statuses, [302, 302, 429])
@@ -0,0 +1,97 @@
+import io
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.shortcuts import reverse
+from django.test import TransactionTestCase, override_settings
+from PIL import Image
+
+from posts.models import Post
+from posts.thumbnails import thumbnail_of
+
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ThumbnailsTest(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='laura')
+
+    def tearDown(self):
+        cache.clear()
+
+    @staticmethod
+    def get_test_img(color):
+        image = Image.new('RGB', (40, 20), color)
+        byte_arr = io.BytesIO()
+        image.save(byte_arr, format='jpeg')
+        return SimpleUploadedFile(
+            name=f'{color}.jpeg',
+            content=byte_arr.getvalue(),
+            content_type='image/jpeg'
+        )
+
+    def test_generated_on_upload(self):
+        """test if every geometry is rendered once the upload commits"""
+        post = Post.objects.create(
+            text='text', author=self.author, image=self.get_test_img('red')
+        )
+        post.refresh_from_db()
+        stored = json.loads(post.thumbnails)
+        self.assertLessEqual(set(settings.POST_THUMBNAILS), set(stored))
+        self.assertEqual(stored['preview'][1:], [40, 20])
+        self.assertEqual(stored['cover'][1:], [960, 339])
+
+    def test_regenerated_on_image_change(self):
+        """test if a new image replaces the stored thumbnails"""
+        post = Post.objects.create(
+            text='text', author=self.author, image=self.get_test_img('red')
+        )
+        post.refresh_from_db()
+        before = post.thumbnails
+        post.text = 'edited'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnails, before)
+        post.image = self.get_test_img('blue')
+        post.save()
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnails)
+        self.assertNotEqual(post.thumbnails, before)
+
+    def test_templates_never_render(self):
+        """test if feeds show stored thumbnails without resizing"""
+        post = Post.objects.create(
+            text='text', author=self.author, image=self.get_test_img('red')
+        )
+        post.refresh_from_db()
+        with mock.patch(
+            'sorl.thumbnail.base.ThumbnailBackend.get_thumbnail',
+            side_effect=AssertionError('rendered during a request')
+        ):
+            response = self.client.get(reverse('posts:index'))
+            self.assertContains(response, thumbnail_of(post, 'preview').url)
+            response = self.client.get(post.get_absolute_url())
+            self.assertContains(response, thumbnail_of(post, 'cover').url)
+
+    def test_original_until_generated(self):
+        """test if the original image is shown until the worker is done"""
+        post = Post.objects.create(
+            text='text', author=self.author, image=self.get_test_img('red')
+        )
+        Post.objects.filter(pk=post.pk).update(thumbnails='')
+        post.refresh_from_db()
+        self.assertEqual(thumbnail_of(post, 'cover').url, post.image.url)
@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.shortcuts import reverse
+from django.test import TestCase, Client, override_settings
+
+from posts.models import Post, Follow, TimelineEntry
+from posts import timeline
+
+
+User = get_user_model()
+
+
+@override_settings(POSTS_PER_PAGE=3)
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='homie')
+        cls.author = User.objects.create_user(username='vato')
+        cls.celebrity = User.objects.create_user(username='loco')
+        for number in range(4):
+            Post.objects.create(text=f'author {number}', author=cls.author)
+            Post.objects.create(text=f'celeb {number}', author=cls.celebrity)
+        cls.FOLLOW_INDEX = reverse('posts:follow_index')
+
+    @classmethod
+    def tearDownClass(cls):
+        cache.clear()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def tearDown(self):
+        cache.clear()
+
+    def follow(self, author):
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=(author.username,))
+        )
+
+    def read_feed(self):
+        posts, cursor = [], None
+        while True:
+            params = {'cursor': cursor} if cursor else {}
+            page = self.reader_client.get(
+                self.FOLLOW_INDEX, params
+            ).context['page_obj']
+            posts.extend(page)
+            if not page.has_next():
+                return posts
+            cursor = page.next_cursor
+
+    def test_follow_backfills_and_unfollow_trims(self):
+        """test if following copies posts and unfollowing removes them"""
+        self.follow(self.author)
+        entries = TimelineEntry.objects.filter(user=self.reader)
+        self.assertEqual(entries.count(), 4)
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,))
+        )
+        self.assertFalse(entries.exists())
+
+    def test_new_post_fans_out(self):
+        """test if a followed author's new post lands in the timeline"""
+        self.follow(self.author)
+        post = Post.objects.create(text='fresh', author=self.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.read_feed()[0], post)
+
+    def test_pulled_authors_are_merged(self):
+        """test if authors above the fan-out limit are merged on read"""
+        self.follow(self.author)
+        fan = User.objects.create_user(username='fan')
+        Follow.objects.create(user=fan, author=self.celebrity)
+        with self.settings(TIMELINE_FANOUT_LIMIT=1):
+            self.follow(self.celebrity)
+            self.assertEqual(timeline.pulled_authors(self.reader.pk), [
+                self.celebrity.pk
+            ])
+            Post.objects.create(text='celeb fresh', author=self.celebrity)
+            self.assertFalse(TimelineEntry.objects.filter(
+                user=self.reader, author=self.celebrity
+            ).exists())
+            received = self.read_feed()
+        expected = list(Post.objects.filter(
+            author__in=(self.author, self.celebrity)
+        ))
+        self.assertEqual(received, expected)
+
+    def test_pulled_author_pushed_again(self):
+        """test if posts from the pull period survive a switch to push"""
+        fan = User.objects.create_user(username='fan')
+        Follow.objects.create(user=fan, author=self.celebrity)
+        with self.settings(TIMELINE_FANOUT_LIMIT=1):
+            self.follow(self.celebrity)
+            fresh = Post.objects.create(
+                text='celeb fresh', author=self.celebrity
+            )
+            Follow.objects.filter(user=fan).delete()
+            self.assertFalse(timeline.pulled_authors(self.reader.pk))
+            self.assertTrue(TimelineEntry.objects.filter(
+                user=self.reader, post=fresh
+            ).exists())
+            received = self.read_feed()
+        self.assertEqual(received, list(self.celebrity.posts.all()))
+
+    def test_rebuild(self):
+        """test if rebuilding restores entries from the follow graph"""
+        Follow.objects.bulk_create([
+            Follow(user=self.reader, author=self.author)
+        ])
+        timeline.rebuild()
+        self.assertEqual(self.read_feed(), list(self.author.posts.all()))
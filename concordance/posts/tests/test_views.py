@@ -14,6 +14,7 @@ from PIL import Image
 
 from posts.models import Post, Group, Comment, Follow
 from posts.forms import PostForm
+from posts import feed_cache
 
 
 User = get_user_model()
@@ -314,19 +315,71 @@ class PostsViewTests(ViewTests, TestCase):
                     expected_form.instance._meta.get_field(field)
                 )
 
+    def test_keyset_pagination(self):
+        """test if cursors walk the whole feed back and forth"""
+        pages = [self.client.get(self.INDEX).context['page_obj']]
+        while pages[-1].has_next():
+            response = self.client.get(
+                self.INDEX, {'cursor': pages[-1].next_cursor}
+            )
+            pages.append(response.context['page_obj'])
+        seen = [post for page in pages for post in page]
+        self.assertEqual(seen, list(Post.objects.all()))
+        self.assertEqual(
+            len(pages), ceil(self.POST_COUNT / TEST_POSTS_PER_PAGE)
+        )
+        self.assertFalse(pages[0].has_previous())
+        response = self.client.get(
+            self.INDEX, {'cursor': pages[1].previous_cursor}
+        )
+        self.assertEqual(
+            list(response.context['page_obj']), list(pages[0])
+        )
+        response = self.client.get(self.INDEX, {'cursor': 'garbage'})
+        self.assertEqual(
+            list(response.context['page_obj']), list(pages[0])
+        )
+
     def test_index_cached(self):
-        """test if index page content is cached"""
+        """test if index page is served from cache until a post changes"""
+        feed_cache.reset_stats()
         response = self.client.get(self.INDEX)
         test_post = response.context['page_obj'].object_list[-1]
         test_post_as_bytes = test_post.text.encode('utf-8')
-        Post.objects.get(id=test_post.id).delete()
-        # test if deleted post remains on the page
+        # an update that bypasses model signals is not picked up
+        Post.objects.filter(id=test_post.id).update(text='stale')
         response = self.client.get(self.INDEX)
         self.assertIn(test_post_as_bytes, response.content)
-        # test if a post is removed from the page after cache flush
-        cache.clear()
+        self.assertEqual(feed_cache.stats()['hits'], 1)
+        # deleting through the ORM bumps the feed version
+        Post.objects.get(id=test_post.id).delete()
         response = self.client.get(self.INDEX)
         self.assertNotIn(test_post_as_bytes, response.content)
+        self.assertEqual(feed_cache.stats()['misses'], 2)
+
+    def test_cursor_normalized(self):
+        """test if broken cursors share the first page's cache entry"""
+        feed_cache.reset_stats()
+        first = self.client.get(self.INDEX).context['page_obj']
+        for cursor in ('garbage', 'x' * 500, ''):
+            self.client.get(self.INDEX, {'cursor': cursor})
+        self.client.get(self.INDEX, {'cursor': first.next_cursor})
+        self.client.get(self.INDEX, {'cursor': first.next_cursor})
+        self.assertEqual(feed_cache.stats(), {
+            'hits': 4, 'misses': 2, 'hit_ratio': 4 / 6,
+        })
+
+    def test_group_feed_invalidated(self):
+        """test if moving a post between groups refreshes both pages"""
+        moved = Post.objects.filter(group__slug='test-group-1').first()
+        for url in (self.GROUP_1, self.GROUP_2):
+            self.client.get(url)
+        moved.group = Group.objects.get(slug='test-group-2')
+        moved.save()
+        old_page = self.client.get(self.GROUP_1).context['page_obj']
+        new_page = self.client.get(self.GROUP_2).context['page_obj']
+        self.assertNotIn(moved, old_page)
+        self.assertIn(moved, new_page)
 
     # testing post presence
 
@@ -382,6 +435,18 @@ class PostsViewTests(ViewTests, TestCase):
         followings = self.user_random.follower.all().count()
         self.assertEqual(followings, 2)
 
+    def test_follow_state_is_viewers(self):
+        """test if the follow button reflects the viewer's own follow"""
+        Follow.objects.create(
+            user=User.objects.get(username='loco'),
+            author=User.objects.get(username='vato'),
+        )
+        response = self.auth_client.get(self.PROFILE_1)
+        self.assertFalse(response.context['following'])
+        self.follow('vato')
+        response = self.auth_client.get(self.PROFILE_1)
+        self.assertTrue(response.context['following'])
+
     def test_follows_rendered(self):
         """test if only followed author's posts are displayed"""
         for username in ('vato', 'loco'):
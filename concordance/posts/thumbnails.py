@@ -0,0 +1,178 @@
+"""Thumbnails rendered off the request path.
+
+Saving a post with a new image queues ``generate`` on a local thread
+pool once the transaction commits. The worker renders every geometry in
+``POST_THUMBNAILS`` through sorl and stores the resulting names on the
+post, so templates only build URLs and never resize images themselves.
+"""
+import json
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from sorl.thumbnail import default, get_thumbnail
+
+from . import feed_cache, images
+from .models import Post
+
+
+logger = logging.getLogger(__name__)
+
+
+class Thumbnail(namedtuple('Thumbnail', 'url width height variants webp')):
+    """A stored thumbnail with its ``(url, density)`` variants."""
+
+    @property
+    def srcset(self):
+        return srcset(self.variants)
+
+    @property
+    def webp_srcset(self):
+        return srcset(self.webp)
+
+
+def srcset(variants, build_url=str):
+    """``srcset`` attribute value of ``(url, density)`` pairs."""
+    return ', '.join(
+        f'{build_url(url)} {density}' for url, density in variants
+    )
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+    return _executor
+
+
+def scale(geometry, factor):
+    return 'x'.join(
+        str(int(side) * factor) if side else '' for side in geometry.split('x')
+    )
+
+
+def variant_key(alias, density, webp=False):
+    key = alias if density == 1 else f'{alias}@{density}x'
+    return f'{key}.webp' if webp else key
+
+
+def render(image):
+    """Render every configured geometry, keyed by alias.
+
+    Besides ``alias`` itself, every ``POST_THUMBNAIL_DENSITIES`` multiple
+    that comes out larger is stored as ``alias@2x`` and so on, and with
+    WebP enabled each of them gets a ``.webp`` sibling.
+    """
+    formats = [False, True] if images.webp_enabled() else [False]
+    rendered = {}
+    for alias, (geometry, options) in settings.POST_THUMBNAILS.items():
+        for webp in formats:
+            width = 0
+            for density in settings.POST_THUMBNAIL_DENSITIES:
+                variant = dict(options)
+                if density > 1:
+                    # a larger copy of a small original adds nothing
+                    variant['upscale'] = False
+                if webp:
+                    variant['format'] = 'WEBP'
+                thumbnail = get_thumbnail(
+                    image, scale(geometry, density), **variant
+                )
+                if thumbnail.width <= width:
+                    break
+                width = thumbnail.width
+                rendered[variant_key(alias, density, webp)] = [
+                    thumbnail.name, thumbnail.width, thumbnail.height
+                ]
+    return rendered
+
+
+def generate(post_id):
+    """Render and store the thumbnails of one post.
+
+    The result is only written if the post still has the image it was
+    rendered from, so a slow worker can not overwrite a newer upload.
+    """
+    post = Post.objects.filter(pk=post_id).only(
+        'author', 'group', 'image'
+    ).first()
+    if post is None or not post.image:
+        return False
+    rendered = render(post.image)
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnails=json.dumps(rendered)
+    )
+    if updated:
+        feed_cache.invalidate(
+            f'card:post:{post.pk}', *feed_cache.post_scopes(post)
+        )
+    return bool(updated)
+
+
+def _work(post_id):
+    try:
+        generate(post_id)
+    except Exception:
+        logger.exception('Could not generate thumbnails of post %s', post_id)
+    finally:
+        connection.close()
+
+
+def schedule(post_id):
+    if settings.THUMBNAIL_WORKERS:
+        get_executor().submit(_work, post_id)
+    else:
+        generate(post_id)
+
+
+def queue(post):
+    """Generate thumbnails of ``post`` once its transaction commits."""
+    post_id = post.pk
+    transaction.on_commit(lambda: schedule(post_id))
+
+
+def thumbnail_of(post, alias):
+    """Pre-generated thumbnail of ``post``, or its original image.
+
+    Falls back to the unscaled upload while the worker has not caught up,
+    it never renders anything itself.
+    """
+    return stored_thumbnail(post.image.name, post.thumbnails, alias)
+
+
+def stored_thumbnail(image, rendered, alias):
+    """``thumbnail_of`` from the raw ``image`` and ``thumbnails`` columns."""
+    if not image:
+        return None
+    stored = json.loads(rendered) if rendered else {}
+    if alias not in stored:
+        return Thumbnail(
+            Post._meta.get_field('image').storage.url(image), None, None,
+            (), (),
+        )
+
+    def variants(webp):
+        found = []
+        for density in settings.POST_THUMBNAIL_DENSITIES:
+            key = variant_key(alias, density, webp)
+            if key in stored:
+                url = default.storage.url(stored[key][0])
+                found.append((url, f'{density}x'))
+        return tuple(found)
+
+    name, width, height = stored[alias]
+    return Thumbnail(
+        default.storage.url(name), width, height,
+        variants(False), variants(True),
+    )
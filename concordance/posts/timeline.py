@@ -0,0 +1,196 @@
+"""Materialized follow timelines.
+
+New posts are pushed into a ``TimelineEntry`` row per follower, so reading
+the follow feed is one range scan over ``(user, pub_date, post)``.
+Authors with more than ``TIMELINE_FANOUT_LIMIT`` followers are not pushed:
+their posts are pulled and merged into the page at read time instead.
+An author who falls back to the limit has their recent posts pushed to
+every follower, since posts published meanwhile were never fanned out.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from . import follow_graph
+from .models import Follow, Post, TimelineEntry, UserStats
+from .utils import KeysetPaginator, keyset_slice
+
+
+def is_pulled(author_id):
+    return (
+        follow_graph.followers_count(author_id)
+        > settings.TIMELINE_FANOUT_LIMIT
+    )
+
+
+def pulled_authors(user_id):
+    """Followed authors whose posts are merged at read time."""
+    counts = follow_graph.followers_counts(follow_graph.following(user_id))
+    return sorted(
+        author_id for author_id, count in counts.items()
+        if count > settings.TIMELINE_FANOUT_LIMIT
+    )
+
+
+def _insert(entries):
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=500, ignore_conflicts=True
+    )
+
+
+def fan_out(*posts):
+    """Push new posts into their authors' followers' timelines."""
+    by_author = defaultdict(list)
+    for post in posts:
+        by_author[post.author_id].append(post)
+    for author_id, authored in by_author.items():
+        if is_pulled(author_id):
+            continue
+        followers = Follow.objects.filter(
+            author_id=author_id
+        ).values_list('user_id', flat=True)
+        _insert(
+            TimelineEntry(
+                user_id=user_id, post_id=post.pk,
+                author_id=author_id, pub_date=post.pub_date,
+            )
+            for user_id in followers.iterator()
+            for post in authored
+        )
+
+
+def backfill(user_id, author_id):
+    """Copy an author's recent posts into a new follower's timeline."""
+    if is_pulled(author_id):
+        return
+    posts = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-id'
+    )[:settings.TIMELINE_BACKFILL]
+    _insert(
+        TimelineEntry(
+            user_id=user_id, post_id=pk,
+            author_id=author_id, pub_date=pub_date,
+        )
+        for pk, pub_date in posts.values_list('pk', 'pub_date')
+    )
+
+
+def trim(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+PUSH_SQL = """
+INSERT OR IGNORE INTO {entry} (user_id, post_id, author_id, pub_date)
+SELECT follow.user_id, latest.id, latest.author_id, latest.pub_date
+FROM {follow} follow
+JOIN (
+    SELECT id, author_id, pub_date FROM {post}
+    WHERE author_id = %s
+    ORDER BY pub_date DESC, id DESC
+    LIMIT %s
+) latest ON latest.author_id = follow.author_id
+ORDER BY follow.user_id, latest.pub_date DESC, latest.id DESC
+"""
+
+
+def push_author(author_id):
+    """Copy an author's recent posts into every follower's timeline."""
+    sql = PUSH_SQL.format(
+        entry=TimelineEntry._meta.db_table,
+        follow=Follow._meta.db_table,
+        post=Post._meta.db_table,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [author_id, settings.TIMELINE_BACKFILL])
+
+
+def unfollowed(author_id):
+    """Switch the author back to push once they fall to the limit.
+
+    Runs after the followers counter was decremented, in the deleting
+    transaction, so exactly one unfollow sees the count cross over.
+    """
+    count = UserStats.objects.filter(user_id=author_id).values_list(
+        'followers_count', flat=True
+    ).first()
+    if count == settings.TIMELINE_FANOUT_LIMIT:
+        push_author(author_id)
+
+
+REBUILD_SQL = """
+INSERT INTO {entry} (user_id, post_id, author_id, pub_date)
+SELECT follow.user_id, latest.id, latest.author_id, latest.pub_date
+FROM {follow} follow
+JOIN (
+    SELECT id, author_id, pub_date, ROW_NUMBER() OVER (
+        PARTITION BY author_id ORDER BY pub_date DESC, id DESC
+    ) AS position
+    FROM {post}
+) latest ON latest.author_id = follow.author_id
+LEFT JOIN {stats} stats ON stats.user_id = follow.author_id
+WHERE latest.position <= %s
+AND COALESCE(stats.followers_count, 0) <= %s
+ORDER BY follow.user_id, latest.pub_date DESC, latest.id DESC
+"""
+
+
+def rebuild():
+    """Refill every timeline from the follow graph in one statement.
+
+    Rows are inserted in index order, which keeps index maintenance
+    close to sequential on large rebuilds.
+    """
+    sql = REBUILD_SQL.format(
+        entry=TimelineEntry._meta.db_table,
+        follow=Follow._meta.db_table,
+        post=Post._meta.db_table,
+        stats=UserStats._meta.db_table,
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        TimelineEntry.objects.all().delete()
+        cursor.execute(
+            sql, [settings.TIMELINE_BACKFILL, settings.TIMELINE_FANOUT_LIMIT]
+        )
+
+
+class TimelinePaginator(KeysetPaginator):
+    """Keyset pages over a user's materialized timeline.
+
+    Pushed entries and pulled authors' posts are both sliced along
+    ``(pub_date, id)`` and merged, so a page never needs more than
+    ``per_page + 1`` rows from either source.
+    """
+
+    def __init__(self, user, per_page):
+        self.user = user
+        self.pulled = pulled_authors(user.pk)
+        super().__init__(
+            Post.objects.filter(author__following__user=user), per_page
+        )
+
+    def fetch(self, position, backwards, limit):
+        descending = self.descending != backwards
+        entries = TimelineEntry.objects.filter(
+            user=self.user
+        ).select_related('post__author', 'post__group')
+        if self.pulled:
+            entries = entries.exclude(author_id__in=self.pulled)
+        posts = [
+            entry.post for entry in keyset_slice(
+                entries, ('pub_date', 'post_id'), position, descending, limit
+            )
+        ]
+        if self.pulled:
+            posts += keyset_slice(
+                Post.objects.filter(
+                    author_id__in=self.pulled
+                ).select_related('author', 'group'),
+                self.keys, position, descending, limit
+            )
+            posts.sort(key=self.position, reverse=descending)
+        return posts[:limit]
+
+
+def get_page(user, cursor):
+    return TimelinePaginator(user, settings.POSTS_PER_PAGE).get_page(cursor)
@@ -36,11 +36,21 @@ urlpatterns = [
         views.post_detail,
         name='post_detail'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
         name='add_comment'
     ),
+    path(
+        'search/',
+        views.search_posts,
+        name='search'
+    ),
     path(
         'follow/',
         views.follow_index,
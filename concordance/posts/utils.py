@@ -1,7 +1,159 @@
+import base64
+import binascii
+from collections.abc import Sequence
+
 from django.core.paginator import Paginator
 from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
 
 
 def get_page_obj(query_set, page_number, page_size=settings.POSTS_PER_PAGE):
     paginator = Paginator(query_set, settings.POSTS_PER_PAGE)
     return paginator.get_page(page_number)
+
+
+def encode_cursor(position, backwards=False):
+    """Pack a (pub_date, id) position into an opaque url-safe token."""
+    timestamp, pk = position
+    raw = '{}|{}|{}'.format(
+        'p' if backwards else 'n', timestamp.isoformat(), pk
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return ``(position, backwards)``; broken tokens mean the first page."""
+    if not cursor:
+        return None, False
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        direction, timestamp, pk = raw.split('|')
+        timestamp = parse_datetime(timestamp)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None, False
+    if timestamp is None or direction not in ('n', 'p'):
+        return None, False
+    return (timestamp, pk), direction == 'p'
+
+
+class KeysetPage(Sequence):
+    """A page of a keyset paginator.
+
+    Mimics the parts of ``django.core.paginator.Page`` the templates rely
+    on, but carries cursors instead of page numbers.
+    """
+    keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor,
+                 cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.cursor = cursor
+
+    def __repr__(self):
+        return '<Keyset page at {}>'.format(self.cursor or 'start')
+
+    def __getstate__(self):
+        # the paginator holds the unevaluated queryset, pickling it
+        # would pull the whole table into the cache entry
+        state = self.__dict__.copy()
+        state['paginator'] = None
+        return state
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Paginate a queryset over a ``(pub_date, id)`` keyset.
+
+    Every page is a range scan on the ``pub_date`` index starting from the
+    boundary row of the previous one, so neither ``COUNT(*)`` nor ``OFFSET``
+    is issued and deep pages cost the same as the first one.
+    """
+
+    def __init__(self, object_list, per_page, keys=('pub_date', 'id'),
+                 descending=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.keys = keys
+        self.descending = descending
+
+    def get_page(self, cursor=None):
+        position, backwards = decode_cursor(cursor)
+        rows = self.fetch(position, backwards, self.per_page + 1)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        has_next = has_more if not backwards else position is not None
+        has_previous = has_more if backwards else position is not None
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(self.position(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = encode_cursor(
+                self.position(rows[0]), backwards=True
+            )
+        return KeysetPage(
+            rows, self, next_cursor, previous_cursor, cursor=cursor
+        )
+
+    def position(self, obj):
+        if isinstance(obj, dict):
+            # rows of a values() queryset
+            return tuple(obj[key] for key in self.keys)
+        return tuple(getattr(obj, key) for key in self.keys)
+
+    def fetch(self, position, backwards, limit):
+        """Return up to ``limit`` rows following ``position``."""
+        descending = self.descending != backwards
+        return keyset_slice(
+            self.object_list, self.keys, position, descending, limit
+        )
+
+
+def keyset_slice(query_set, keys, position, descending, limit):
+    """Up to ``limit`` rows strictly past ``position`` along ``keys``."""
+    prefix = '-' if descending else ''
+    query_set = query_set.order_by(*(prefix + key for key in keys))
+    if position is not None:
+        lookup = 'lt' if descending else 'gt'
+        (major, minor), (major_value, minor_value) = keys, position
+        query_set = query_set.filter(
+            Q(**{f'{major}__{lookup}': major_value})
+            | Q(**{major: major_value, f'{minor}__{lookup}': minor_value})
+        )
+    return list(query_set[:limit])
+
+
+def get_keyset_page(query_set, cursor, page_size=None):
+    paginator = KeysetPaginator(
+        query_set, page_size or settings.POSTS_PER_PAGE
+    )
+    return paginator.get_page(cursor)
+
+
+def paginate(request, query_set):
+    """Keyset page by default, numbered page when ``?page=`` is requested."""
+    page_num = request.GET.get('page')
+    if page_num is not None:
+        return get_page_obj(query_set, page_num)
+    return get_keyset_page(query_set, request.GET.get('cursor'))
@@ -1,23 +1,83 @@
+from django.conf import settings
 from django.db import IntegrityError
 from django.contrib import messages
 from django.views.generic.edit import CreateView, UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.shortcuts import render, reverse, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
 
-from .models import Group, Post, User, Follow
+from core.db import retry_on_busy
+from core.throttling import throttle
+
+from .models import Comment, Group, Post, User, Follow
 from .forms import PostForm, CommentForm
-from .utils import get_page_obj
+from .utils import KeysetPaginator, get_page_obj, paginate
+from . import feed_cache, follow_graph, search, timeline
+from .conditional import conditional_page
+
+
+def group_scopes(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True
+    ).first()
+    if group_id is None:
+        return None
+    return [f'group:{group_id}']
+
+
+def get_profile_author(request, username):
+    """The profile's author with counters and the viewer's follow state.
+
+    One query, made once per request: the conditional check and the view
+    share the result. The follow state comes from the cached follow graph.
+    """
+    cached = getattr(request, '_profile_author', None)
+    if cached is not None and cached[0] == username:
+        return cached[1]
+    author = User.objects.select_related('stats').filter(
+        username=username
+    ).first()
+    if author is not None:
+        author.is_followed = follow_graph.is_following(
+            request.user.pk, author.pk
+        )
+    request._profile_author = (username, author)
+    return author
+
+
+def profile_scopes(request, username):
+    author = get_profile_author(request, username)
+    if author is None:
+        return None
+    author_id = author.pk
+    # counters and the follow button change with follows of either side
+    scopes = [f'profile:{author_id}', 'groups', f'user:{author_id}']
+    if request.user.is_authenticated:
+        scopes.append(f'user:{request.user.pk}')
+    return scopes
 
 
+def post_scopes(request, post_id):
+    author_id = Post.objects.filter(pk=post_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    # the author's post count changes with every post they publish
+    return [f'post:{post_id}', 'groups', f'profile:{author_id}']
+
+
+@conditional_page(lambda request: ['index', 'groups'])
 def index(request):
-    page_num = request.GET.get('page')
-    page_obj = cache.get_or_set(
-        f'page-{page_num}',
-        get_page_obj(Post.objects.all(), page_num),
-        timeout=20)
+    page_obj = feed_cache.get_page(
+        request,
+        lambda: paginate(
+            request, Post.objects.select_related('author', 'group')
+        ),
+        'index', 'groups',
+    )
     context = {
         'page_obj': page_obj,
     }
@@ -37,7 +97,8 @@ class PostCreateView(LoginRequiredMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        self.object = retry_on_busy(form.save)()
+        return redirect(self.get_success_url())
 
 
 class PostUpdateView(UpdateView):
@@ -66,10 +127,16 @@ class PostUpdateView(UpdateView):
         return super().dispatch(request, *args, **kwargs)
 
 
+@conditional_page(group_scopes)
 def group_posts(request, slug):
     com_group = get_object_or_404(Group, slug=slug)
-    page_num = request.GET.get('page')
-    page_obj = get_page_obj(com_group.posts.all(), page_num)
+    page_obj = feed_cache.get_page(
+        request,
+        lambda: paginate(
+            request, com_group.posts.select_related('author', 'group')
+        ),
+        f'group:{com_group.id}',
+    )
     context = {
         'title': com_group.title,
         'description': com_group.description,
@@ -79,42 +146,85 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@conditional_page(profile_scopes)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    following = (
-        request.user.is_authenticated
-        and User.objects.filter(following__author=author).exists()
-    )
-    page_num = request.GET.get('page')
-    page_obj = get_page_obj(
-        Post.objects.filter(author_id=author.id),
-        page_num
+    author = get_profile_author(request, username)
+    if author is None:
+        raise Http404('No user matches the given query.')
+    page_obj = feed_cache.get_page(
+        request,
+        lambda: paginate(
+            request,
+            Post.objects.filter(author_id=author.id).select_related('group')
+        ),
+        f'profile:{author.id}', 'groups',
     )
+    # every post is the author's, no need to join them in again
+    for post in page_obj:
+        post.author = author
     context = {
         'author': author,
         'page_obj': page_obj,
-        'following': following,
+        'following': author.is_followed,
     }
     return render(request, 'posts/profile.html', context)
 
 
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = get_page_obj(
+        search.search_posts(
+            query, Post.objects.select_related('author', 'group')
+        ),
+        request.GET.get('page')
+    )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
+def get_comments_page(post_id, cursor):
+    """Oldest first keyset page of a post's comments."""
+    return KeysetPaginator(
+        Comment.objects.filter(post_id=post_id).select_related('author'),
+        settings.COMMENTS_PER_PAGE,
+        descending=False,
+    ).get_page(cursor)
+
+
+@conditional_page(post_scopes)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), id=post_id
+    )
     form = CommentForm(request.POST or None)
     context = {
         'post': post,
-        'comments': post.comments.all(),
+        'post_id': post.id,
+        'comments': get_comments_page(post.id, request.GET.get('comments')),
         'form': form,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@conditional_page(lambda request, post_id: [f'post:{post_id}'])
+def post_comments(request, post_id):
+    """Next chunk of comments for the "load more" link."""
+    comments = get_comments_page(post_id, request.GET.get('cursor'))
+    if not comments and not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    context = {
+        'post_id': post_id,
+        'comments': comments,
+    }
+    return render(request, 'posts/includes/comment_list.html', context)
+
+
 @login_required
 def follow_index(request):
-    page_num = request.GET.get('page')
-    page_obj = get_page_obj(
-        Post.objects.filter(author__following__user=request.user),
-        page_num)
+    page_obj = timeline.get_page(request.user, request.GET.get('cursor'))
     context = {
         'title': 'Подписки',
         'page_obj': page_obj,
@@ -123,26 +233,32 @@ def follow_index(request):
 
 
 @login_required
+@throttle('follow')
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
+    if author == request.user:
+        messages.warning(request, 'Вы не можете подписаться на самого себя!')
+        return redirect('posts:profile', username=username)
     try:
-        follow = Follow.objects.create(user=request.user, author=author)
+        retry_on_busy(Follow.objects.create)(user=request.user, author=author)
     except IntegrityError:
-        messages.warning(request, 'Вы не можете подписаться на самого себя!')
-    else:
-        follow.save()
+        # already following
+        pass
     return redirect('posts:profile', username=username)
 
 
 @login_required
+@throttle('follow')
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    follow = Follow.objects.filter(user=request.user, author=author)
-    follow.delete()
+    retry_on_busy(
+        Follow.objects.filter(user=request.user, author=author).delete
+    )()
     return redirect('posts:profile', username=username)
 
 
 @login_required
+@throttle('comment')
 def add_comment(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     form = CommentForm(request.POST or None)
@@ -150,5 +266,5 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        retry_on_busy(comment.save)()
     return redirect('posts:post_detail', post_id=post_id)
@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.shortcuts import reverse
+from django.test import TestCase
+
+from core.testing import QueryBudgetMixin
+
+
+User = get_user_model()
+
+
+class UsersQueryBudgetTest(QueryBudgetMixin, TestCase):
+    QUERY_BUDGETS = {
+        'users:signup': 0,
+        'users:login': 0,
+        'users:password_reset_form': 0,
+        'users:password_change': 2,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='audrey')
+
+    def test_pages_within_budget(self):
+        """test if auth pages stay within their query budgets"""
+        for name in ('users:signup', 'users:login',
+                     'users:password_reset_form'):
+            with self.subTest(name=name):
+                self.assertWithinBudget(self.client.get(reverse(name)))
+        self.client.force_login(self.user)
+        self.assertWithinBudget(
+            self.client.get(reverse('users:password_change'))
+        )